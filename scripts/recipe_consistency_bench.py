@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the GlycoGuide Recipe Consistency Checker
+
+Generates a deterministic synthetic corpus shaped like the `meals` table
+(no DATABASE_URL needed) and times:
+- RecipeAnalysis construction (shared parsing stage)
+- Each check function against a prebuilt analysis
+- End-to-end checking via check_recipes()
+
+Results are written as JSON; --baseline compares against a stored run and
+exits non-zero when any stage regresses past --threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional
+
+import recipe_consistency_checker as checker
+
+BENCH_FILE = 'scripts/audit_reports/recipe_consistency_bench.json'
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+
+CATEGORIES = ['breakfast', 'lunch', 'dinner', 'snack', 'dessert']
+
+LOW_GI_INGREDIENTS = [
+    'zucchini', 'cauliflower', 'quinoa', 'chickpea', 'lentils', 'spinach',
+    'kale', 'broccoli', 'almond flour', 'sweet potato', 'salmon', 'chicken',
+    'tomato', 'onion', 'garlic', 'bell pepper', 'avocado', 'walnuts',
+    'greek yogurt', 'blueberries', 'cinnamon', 'ginger', 'turmeric',
+    'olive oil', 'lemon', 'lime', 'coriander', 'aubergine', 'oatmeal',
+    'monk fruit extract', 'black beans', 'tofu', 'mushrooms', 'celery',
+]
+
+ALIAS_VARIANTS = [variant for variants in checker.INGREDIENT_ALIASES.values() for variant in variants]
+
+FORBIDDEN_ITEMS = sorted(checker.FORBIDDEN_INGREDIENTS)
+
+CRITICAL_ITEMS = sorted(checker.CRITICAL_INGREDIENTS)
+
+UNITS = ['cup', 'cups', 'tbsp', 'tsp', 'oz', 'lb', 'grams', 'ml']
+
+DESCRIPTION_FILLER = [
+    'a', 'delicious', 'nourishing', 'balanced', 'meal', 'that', 'supports',
+    'steady', 'energy', 'with', 'fiber', 'rich', 'vegetables', 'and', 'lean',
+    'protein', 'perfect', 'for', 'busy', 'weeknights', 'this', 'dish', 'keeps',
+    'blood', 'sugar', 'levels', 'stable', 'while', 'tasting', 'great',
+    'inspired', 'by', 'traditional', 'cooking', 'methods', 'healthy', 'fats',
+]
+
+SUBSTITUTION_TEMPLATES = [
+    'use {new} instead of {old}',
+    'we use {new} instead of {old}.',
+    '{new} instead of {old},',
+    'substitute {new} for {old};',
+    'replace {old} with {new}.',
+]
+
+INSTRUCTION_VERBS = ['Chop', 'Dice', 'Saute', 'Roast', 'Simmer', 'Whisk', 'Fold in', 'Season', 'Top with', 'Stir in']
+
+PROTECTED_SENTENCE = 'This helps keep blood sugar levels steady.'
+
+def generate_recipe(rng: random.Random, index: int, description_words: int = 60,
+                    ingredient_count: int = 10, forbidden_density: float = 0.05,
+                    alias_density: float = 0.2, substitution_density: float = 0.3) -> Dict[str, Any]:
+    """Build one meals-shaped record"""
+    names = []
+    ingredients = []
+    for _ in range(ingredient_count):
+        roll = rng.random()
+        if roll < forbidden_density:
+            item = rng.choice(FORBIDDEN_ITEMS)
+        elif roll < forbidden_density + alias_density:
+            item = rng.choice(ALIAS_VARIANTS)
+        else:
+            item = rng.choice(LOW_GI_INGREDIENTS)
+        names.append(item)
+        ingredients.append(f"{rng.randint(1, 4)} {rng.choice(UNITS)} {item}")
+
+    words = [rng.choice(DESCRIPTION_FILLER) for _ in range(description_words)]
+    if rng.random() < substitution_density:
+        template = rng.choice(SUBSTITUTION_TEMPLATES)
+        phrase = template.format(new=rng.choice(LOW_GI_INGREDIENTS), old=rng.choice(CRITICAL_ITEMS))
+        words.insert(rng.randrange(len(words) + 1), phrase)
+    description = ' '.join(words).capitalize() + '.'
+
+    steps = []
+    for step, item in enumerate(names, 1):
+        # Some ingredients go unused, some steps mention ingredients not listed
+        if rng.random() < 0.1:
+            item = rng.choice(CRITICAL_ITEMS)
+        elif rng.random() < 0.1:
+            continue
+        steps.append(f"{step}. {rng.choice(INSTRUCTION_VERBS)} the {item} for {rng.randint(2, 15)} minutes.")
+    if rng.random() < 0.2:
+        steps.append(PROTECTED_SENTENCE)
+
+    slug = '_'.join(names[:2]).replace(' ', '_')
+    image_roll = rng.random()
+    if image_roll < 0.05:
+        image_url = ''
+    elif image_roll < 0.15:
+        image_url = f"/images/image_{rng.randint(10 ** 9, 10 ** 10)}.png"
+    else:
+        image_url = f"/images/{slug}_{index}.png"
+
+    carbohydrates = round(rng.uniform(5, 60), 2)
+    protein = round(rng.uniform(2, 45), 2)
+    fat = round(rng.uniform(1, 30), 2)
+    glycemic_value = rng.randint(10, 70)
+
+    return {
+        'id': f"bench-{index:08d}",
+        'name': f"Synthetic {rng.choice(CATEGORIES).title()} {index}",
+        'description': description,
+        'category': rng.choice(CATEGORIES),
+        'glycemic_index': 'low' if glycemic_value <= 55 else 'medium',
+        'glycemic_value': glycemic_value,
+        'carbohydrates': carbohydrates,
+        'calories': int(4 * carbohydrates + 4 * protein + 9 * fat),
+        'protein': protein,
+        'fat': fat,
+        'fiber': round(rng.uniform(0, 15), 2),
+        'image_url': image_url,
+        'ingredients': ingredients,
+        'instructions': ' '.join(steps),
+    }
+
+def generate_corpus(size: int, seed: int = 0, **options: Any) -> Iterator[Dict[str, Any]]:
+    """Yield `size` synthetic recipes; the same seed always yields the same corpus"""
+    rng = random.Random(seed)
+    for index in range(size):
+        yield generate_recipe(rng, index, **options)
+
+def _batches(recipes: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for recipe in recipes:
+        batch.append(recipe)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def time_batch(batch: List[Dict[str, Any]], workers: int = 1) -> Dict[str, float]:
+    """Seconds spent in each stage over one batch"""
+    timings = {}
+
+    start = time.perf_counter()
+    analyses = [checker.RecipeAnalysis(recipe) for recipe in batch]
+    timings['analysis'] = time.perf_counter() - start
+
+    for check in checker.RECIPE_CHECKS:
+        start = time.perf_counter()
+        for recipe, analysis in zip(batch, analyses):
+            check(recipe, analysis)
+        timings[check.__name__] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    issues = 0
+    for _, recipe_issues in checker.check_recipes(iter(batch), workers=workers):
+        issues += len(recipe_issues)
+    timings['end_to_end'] = time.perf_counter() - start
+    timings['issues'] = issues
+
+    return timings
+
+def run_benchmark(size: int, seed: int = 0, batch_size: int = 10000, repeat: int = 1,
+                  workers: int = 1, **options: Any) -> Dict[str, Any]:
+    """Time every stage over the corpus; each stage keeps its best of `repeat` runs"""
+    best: Dict[str, float] = {}
+    issues = 0
+    for _ in range(repeat):
+        totals: Dict[str, float] = {}
+        for batch in _batches(generate_corpus(size, seed, **options), batch_size):
+            for stage, seconds in time_batch(batch, workers=workers).items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        issues = int(totals.pop('issues', 0))
+        for stage, seconds in totals.items():
+            best[stage] = min(best.get(stage, seconds), seconds)
+
+    return {
+        'meta': {
+            'size': size,
+            'seed': seed,
+            'repeat': repeat,
+            'workers': workers,
+            'options': options,
+            'issues': issues,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': datetime.now().isoformat(),
+        },
+        'results': {
+            stage: {
+                'total_s': round(seconds, 6),
+                'per_recipe_us': round(seconds / size * 1e6, 3) if size else 0.0,
+                'recipes_per_s': round(size / seconds, 1) if seconds else 0.0,
+            }
+            for stage, seconds in best.items()
+        },
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Stages whose per-recipe time grew by more than `threshold` (a fraction)"""
+    regressions = []
+    for stage, result in current['results'].items():
+        previous = baseline.get('results', {}).get(stage)
+        if not previous or not previous['per_recipe_us']:
+            continue
+        change = result['per_recipe_us'] / previous['per_recipe_us'] - 1
+        if change > threshold:
+            regressions.append(
+                f"{stage}: {previous['per_recipe_us']:.1f}µs → {result['per_recipe_us']:.1f}µs per recipe (+{change:.0%})"
+            )
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description='Benchmark the recipe consistency checker on a synthetic corpus')
+    parser.add_argument('--size', type=int, default=10000, help='recipes in the corpus (default 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default 0)')
+    parser.add_argument('--description-words', type=int, default=60, help='filler words per description')
+    parser.add_argument('--ingredients', type=int, default=10, help='ingredient lines per recipe')
+    parser.add_argument('--forbidden-density', type=float, default=0.05,
+                        help='probability an ingredient line is a forbidden item')
+    parser.add_argument('--alias-density', type=float, default=0.2,
+                        help='probability an ingredient line uses an alias variant')
+    parser.add_argument('--substitution-density', type=float, default=0.3,
+                        help='probability a description contains a substitution phrase')
+    parser.add_argument('--batch-size', type=int, default=10000, help='recipes generated and timed per batch')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage, best time is kept')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes for the end-to-end stage')
+    parser.add_argument('--output', default=BENCH_FILE, help=f'results JSON (default {BENCH_FILE})')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed per-recipe slowdown vs baseline before flagging (default 0.10)')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main function"""
+    args = parse_args(argv)
+
+    print("⏱️  GlycoGuide Recipe Consistency Checker Benchmark")
+    print("=" * 70)
+
+    print(f"\n🧪 Synthetic corpus: {args.size} recipes (seed {args.seed})")
+
+    report = run_benchmark(
+        args.size, seed=args.seed, batch_size=args.batch_size, repeat=args.repeat, workers=args.workers,
+        description_words=args.description_words, ingredient_count=args.ingredients,
+        forbidden_density=args.forbidden_density, alias_density=args.alias_density,
+        substitution_density=args.substitution_density,
+    )
+
+    print(f"   Issues found: {report['meta']['issues']}\n")
+    for stage, result in report['results'].items():
+        print(f"   {stage:<34} {result['per_recipe_us']:>10.1f} µs/recipe  {result['recipes_per_s']:>10.0f} recipes/s")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('size') != args.size:
+            print(f"⚠️  Baseline corpus size {baseline.get('meta', {}).get('size')} differs from {args.size}")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n🚨 REGRESSIONS vs {args.baseline} (threshold {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"\n✅ No regressions vs {args.baseline}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
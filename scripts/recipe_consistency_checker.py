@@ -16,119 +16,787 @@ import os
 import sys
 import re
 import csv
-from typing import List, Dict, Set, Tuple, Any
+import heapq
+import argparse
+import tempfile
+import mmap
+import sqlite3
+import hashlib
+import json
+import pickle
+import signal
+import select
+import multiprocessing
+import asyncio
+import threading
+import time
+import cProfile
+import pstats
+import difflib
+import warnings
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Set, Tuple, Any, Iterator, Optional, Callable
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+
+try:
+    from PIL import Image
+except ImportError:
+    # Optional: without Pillow the image index only detects shared image URLs
+    Image = None
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: needed only for --near-dups and --nutrition
+    np = None
 
 # ============================================================================
 # CONFIGURATION & NORMALIZATION
 # ============================================================================
 
-# Critical substitutions for low-GI recipes
-CRITICAL_SUBSTITUTIONS = {
-    'sweetener': {
-        'allowed': ['monk fruit extract', '100% monk fruit extract', 'monk fruit'],
-        'forbidden': ['sugar', 'cane sugar', 'brown sugar', 'honey', 'maple syrup', 'agave', 'agave nectar']
-    },
-    'potato': {
-        'allowed': ['sweet potato', 'sweet potatoes'],
-        'forbidden': ['potato', 'white potato', 'russet potato', 'yukon gold', 'red potato', 'potatoes']
-    },
-    'flour': {
-        'allowed': ['almond flour', 'oat flour', 'coconut flour'],
-        'forbidden': ['wheat flour', 'white flour', 'all-purpose flour', 'bread flour', 'all purpose flour']
-    },
-    'bread': {
-        'allowed': ['flatbread', 'lentil flatbread', 'almond flatbread', 'oat flatbread'],
-        'forbidden': ['bread', 'bun', 'buns', 'roll', 'rolls', 'loaf', 'loaves', 'baguette', 'bagel', 'toast']
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Declarative rules (substitutions, aliases, vocabulary, ignore words, patterns,
+# image conflicts) and the compiled artifact built from them by --compile-rules
+RULE_PACK_FILE = os.path.join(SCRIPT_DIR, 'recipe_consistency_rules.json')
+RULE_ARTIFACT_FILE = os.path.join(SCRIPT_DIR, 'recipe_consistency_rules.compiled')
+
+# ============================================================================
+# PHRASE MATCHING
+# ============================================================================
+
+def is_word_char(ch: str) -> bool:
+    """Same definition of a word character as the `\\b` / `\\w` regex classes"""
+    return ch.isalnum() or ch == '_'
+
+# Runs of words separated only by whitespace; a hyphenated compound ('rice-sized',
+# 'sugar-free') is one word
+PHRASE_RUN_PATTERN = re.compile(r'[a-z]+(?:-[a-z]+)*(?:\s+[a-z]+(?:-[a-z]+)*)*')
+PHRASE_WORD_SEPARATOR = re.compile(r'\s+')
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over a fixed phrase list.
+
+    Built once; `find_all` reports every (possibly overlapping) occurrence of
+    every phrase in a single left-to-right pass over the text.
+    """
+
+    __slots__ = ('phrases', '_delta', '_out')
+
+    def __init__(self, phrases: List[str]):
+        self.phrases = list(phrases)
+
+        # Trie of goto transitions
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for index, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(index)
+
+        # Breadth-first failure links, folded into a full transition table so
+        # scanning never has to walk the failure chain
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = list(goto[0].values())
+        for state in queue:
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            out[state] = out[state] + out[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = [
+            tuple((index, len(self.phrases[index])) for index in indices)
+            for indices in out
+        ]
+
+    def state(self) -> Tuple[Any, ...]:
+        """Plain-data form of the built automaton, for the compiled rule artifact"""
+        return self.phrases, self._delta, self._out
+
+    @classmethod
+    def from_state(cls, state: Tuple[Any, ...]) -> 'PhraseAutomaton':
+        automaton = cls.__new__(cls)
+        automaton.phrases, automaton._delta, automaton._out = state
+        return automaton
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, phrase_index) for every occurrence, ordered by end"""
+        delta = self._delta
+        outputs = self._out
+        found = []
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                end = pos + 1
+                for index, length in outputs[state]:
+                    found.append((end - length, end, index))
+        return found
+
+class PhraseTrie:
+    """Word-level trie over a phrase vocabulary mapping each phrase to a canonical name.
+
+    `find` reports every known phrase in a text in one left-to-right pass over
+    its words. Phrases may overlap; a phrase lying entirely inside a longer
+    known phrase is folded into it unless `nested` is set. Words join into a
+    phrase only across whitespace, never across punctuation.
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self, vocabulary: List[Tuple[str, str]]):
+        self._root: Dict[Optional[str], Any] = {}
+        for phrase, canonical in vocabulary:
+            words = PHRASE_WORD_SEPARATOR.split(phrase.strip().lower())
+            node = self._root
+            for word in words:
+                node = node.setdefault(word, {})
+            # First registration of a phrase wins
+            node.setdefault(None, canonical)
+
+    def state(self) -> Dict[Optional[str], Any]:
+        """Plain-data form of the built trie, for the compiled rule artifact"""
+        return self._root
+
+    @classmethod
+    def from_state(cls, state: Dict[Optional[str], Any]) -> 'PhraseTrie':
+        trie = cls.__new__(cls)
+        trie._root = state
+        return trie
+
+    def find(self, text: str, nested: bool = False) -> List[str]:
+        """Canonical names of the known phrases in (lowercase) text, in text order"""
+        root = self._root
+        found = []
+        for run in PHRASE_RUN_PATTERN.findall(text):
+            words = PHRASE_WORD_SEPARATOR.split(run)
+            covered_to = 0
+            for start in range(len(words)):
+                # Longest known phrase starting at this word
+                node = root
+                end = start
+                longest = None
+                while end < len(words):
+                    node = node.get(words[end])
+                    if node is None:
+                        break
+                    end += 1
+                    if None in node:
+                        longest = (end, node[None])
+                        if nested:
+                            found.append(node[None])
+                if longest and longest[0] > covered_to:
+                    covered_to = longest[0]
+                    if not nested:
+                        found.append(longest[1])
+        return found
+
+    def matches(self, words: List[str]) -> List[Tuple[int, int, str]]:
+        """(start, end, canonical) word ranges of the phrases `find` reports in one run of words"""
+        root = self._root
+        found = []
+        covered_to = 0
+        for start in range(len(words)):
+            node = root
+            end = start
+            longest = None
+            while end < len(words):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                end += 1
+                if None in node:
+                    longest = (end, node[None])
+            if longest and longest[0] > covered_to:
+                covered_to = longest[0]
+                found.append((start, longest[0], longest[1]))
+        return found
+
+    def standalone(self, words: List[str]) -> List[str]:
+        """The words that are not part of a known multi-word phrase"""
+        root = self._root
+        inside = [False] * len(words)
+        for start in range(len(words)):
+            node = root
+            end = start
+            longest = start
+            while end < len(words):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                end += 1
+                if None in node:
+                    longest = end
+            if longest - start > 1:
+                inside[start:longest] = [True] * (longest - start)
+        return [word for word, covered in zip(words, inside) if not covered]
+
+# Words ([a-z-] runs) and runs of anything else but whitespace, in one scan
+SUBSTITUTION_TOKEN_PATTERN = re.compile(r'[a-z-]+|[^a-z\s-]+')
+
+# Characters besides whitespace that may end the replaced item
+SUBSTITUTION_TERMINATORS = ',.;'
+
+class SubstitutionParser:
+    """Finds 'use X instead of Y' style phrases in linear time.
+
+    A form is a list of lead keywords ('use', 'replace', ...) and one or more
+    connector phrases ('instead of', 'for', 'with'). X is the words from the
+    lead (or, with no leads, from the start of the clause) to the nearest
+    connector; Y is the single word after it, which must end at whitespace,
+    ',', '.', ';' or the end of the text. A phrase never spans punctuation
+    or digits. Each match resumes the scan after Y, and forms are reported
+    in order, matching the pairs the former regex rules produced.
+
+    The text is tokenised once; each form then walks the words of every
+    clause with a single forward pointer over its connector positions.
+    """
+
+    __slots__ = ('_forms',)
+
+    def __init__(self, forms: List[Dict[str, Any]]):
+        self._forms = [
+            (tuple(form['lead']), tuple(tuple(connector.split()) for connector in form['connectors']))
+            for form in forms
+        ]
+
+    def state(self) -> List[Tuple[Tuple[str, ...], Tuple[Tuple[str, ...], ...]]]:
+        """Plain-data form of the parser, for the compiled rule artifact"""
+        return self._forms
+
+    @classmethod
+    def from_state(cls, state: List[Tuple[Tuple[str, ...], Tuple[Tuple[str, ...], ...]]]) -> 'SubstitutionParser':
+        parser = cls.__new__(cls)
+        parser._forms = state
+        return parser
+
+    def parse(self, text: str) -> List[Tuple[List[str], str]]:
+        """(X words, Y) for every substitution phrase in (lowercase) text"""
+        found: List[List[Tuple[List[str], str]]] = [[] for _ in self._forms]
+        clause: List[Tuple[str, int, int]] = []
+        for token in SUBSTITUTION_TOKEN_PATTERN.finditer(text):
+            word = token.group()
+            if word[0] == '-' or 'a' <= word[0] <= 'z':
+                clause.append((word, token.start(), token.end()))
+            elif clause:
+                self._parse_clause(text, clause, found)
+                clause = []
+        if clause:
+            self._parse_clause(text, clause, found)
+        return [pair for pairs in found for pair in pairs]
+
+    def _parse_clause(self, text: str, clause: List[Tuple[str, int, int]],
+                      found: List[List[Tuple[List[str], str]]]):
+        count = len(clause)
+        if count < 3:
+            return
+        words = [word for word, _, _ in clause]
+        size = len(text)
+        
+        def ends(index: int) -> bool:
+            end = clause[index][2]
+            return end == size or text[end].isspace() or text[end] in SUBSTITUTION_TERMINATORS
+        
+        def follows_word(index: int) -> bool:
+            start = clause[index][1]
+            return start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_')
+        
+        for (leads, connectors), pairs in zip(self._forms, found):
+            # (position, length) of every connector followed by a usable Y
+            joints = []
+            for j in range(1, count - 1):
+                for connector in connectors:
+                    length = len(connector)
+                    if (j + length < count and tuple(words[j:j + length]) == connector
+                            and ends(j + length)):
+                        joints.append((j, length))
+                        break
+            if not joints:
+                continue
+            
+            pointer = 0
+            cursor = 0
+            while cursor < count:
+                if leads:
+                    # Lead keyword: a whole word, or the part after a hyphen
+                    start = None
+                    for k in range(cursor, count - 1):
+                        word = words[k]
+                        for lead in leads:
+                            if word.endswith(lead):
+                                cut = len(word) - len(lead)
+                                if (word[cut - 1] == '-') if cut else not follows_word(k):
+                                    start = k + 1
+                                    break
+                        if start is not None:
+                            break
+                    if start is None:
+                        break
+                    head = []
+                else:
+                    # X begins at the first word boundary at or after the cursor
+                    start = cursor
+                    head = None
+                    while start < count:
+                        word = words[start]
+                        previous = follows_word(start)
+                        for offset, ch in enumerate(word):
+                            is_word = ch != '-'
+                            if is_word != previous:
+                                head = [word[offset:]]
+                                break
+                            previous = is_word
+                        if head is not None:
+                            break
+                        start += 1
+                    if head is None:
+                        break
+                    start += 1
+                
+                # Nearest connector leaving X at least one word
+                minimum = start + (1 if leads else 0)
+                while pointer < len(joints) and joints[pointer][0] < minimum:
+                    pointer += 1
+                if pointer == len(joints):
+                    break
+                j, length = joints[pointer]
+                pairs.append((head + words[start:j], words[j + length]))
+                cursor = j + length + 1
+
+# Whole words (a hyphenated compound is one word), captured so that
+# re.split keeps the text between them
+RESOLVER_WORD_PATTERN = re.compile(r'([a-z]+(?:-[a-z]+)*)')
+
+# Token resolutions memoised per process, besides the vocabulary itself
+DEFAULT_TOKEN_CACHE_SIZE = 32768
+
+def light_stem(word: str) -> str:
+    """Singular form of an English plural ('tomatoes' → 'tomato', 'berries' → 'berry')"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    # 'leaves' → 'leaf', 'halves' → 'half', so that 'leave' is not a form of 'leaves'
+    if len(word) > 4 and word.endswith(('aves', 'lves')):
+        return word[:-3] + 'f'
+    if len(word) > 4 and word.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+def edit_deletes(word: str, distance: int) -> Set[str]:
+    """Every string reachable by deleting up to `distance` letters from word"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (an adjacent swap is one edit); limit + 1 once over limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+class TokenMemo(dict):
+    """Resolved form of each space-separated token of a text ('rice,' → 'rice,').
+
+    Seeded with every vocabulary word as itself, so a token that is already a
+    known word is a plain dict hit; only the rest reach `__missing__`, which
+    resolves their words and keeps the result while fewer than `limit`
+    tokens are stored (after that, new tokens are resolved but not kept).
+    """
+
+    __slots__ = ('resolver', 'limit', 'misses')
+
+    def __init__(self, resolver: 'TokenResolver', limit: int):
+        super().__init__((word, word) for word in resolver._known)
+        self.resolver = resolver
+        self.limit = len(self) + limit
+        self.misses = 0
+
+    def __missing__(self, token: str) -> str:
+        self.misses += 1
+        parts = RESOLVER_WORD_PATTERN.split(token)
+        if len(parts) == 3 and not parts[0] and not parts[2]:
+            resolved = self.resolver._resolve(token)
+        else:
+            parts[1::2] = [self[word] if word in self else self.resolver._resolve(word) for word in parts[1::2]]
+            resolved = ''.join(parts)
+        if len(self) < self.limit:
+            self[token] = resolved
+        return resolved
+
+class TokenResolver:
+    """Maps the words of a text onto the ingredient vocabulary's spelling.
+
+    A word the vocabulary (or the list of known non-ingredient words)
+    contains is kept. Otherwise the plural or singular of a vocabulary word
+    resolves to it ('tomatoes' → 'tomato'), and a misspelling resolves to the
+    one closest ingredient word within the edit distance ('zuchini' →
+    'zucchini'). Ties, short words and words with a derivational ending
+    ('cooled', 'creamy') are never corrected: against a vocabulary this
+    small they are far more often real words than typos.
+
+    Misspellings are looked up in a symmetric-delete (SymSpell) index: every
+    string reachable by deleting up to `max_distance` letters from an
+    ingredient word points back at it, so a lookup only generates the
+    word's own deletes rather than comparing it with every ingredient.
+
+    Tokens go through a TokenMemo sized by `configure`, so rewriting a text
+    costs one split, a dict lookup per token and one join; only tokens that
+    are not known words, and only the first time they are seen, reach the
+    stemmer and the SymSpell index.
+    """
+
+    __slots__ = ('_known', '_stems', '_deletes', '_min_lengths', '_kept_endings', 'max_distance',
+                 'distance', 'cache_size', 'stemmed', 'corrected', 'lookups', '_memo', '_lookup')
+
+    def __init__(self, vocabulary_words: Set[str], ingredient_words: Set[str], known_words: Set[str],
+                 max_distance: int, min_lengths: List[int], kept_endings: List[str]):
+        self._known = frozenset(vocabulary_words) | frozenset(known_words)
+        # Vocabulary words under their own spelling first, then under their stem
+        self._stems: Dict[str, str] = {word: word for word in vocabulary_words}
+        for word in sorted(vocabulary_words):
+            self._stems.setdefault(light_stem(word), word)
+        deletes: Dict[str, List[str]] = {}
+        for word in sorted(ingredient_words):
+            if word.isalpha():
+                for delete in edit_deletes(word, max_distance):
+                    deletes.setdefault(delete, []).append(word)
+        self._deletes = {delete: tuple(words) for delete, words in deletes.items()}
+        # Shortest word corrected at edit distance 1, 2, ...
+        self._min_lengths = tuple(min_lengths[:max_distance])
+        self._kept_endings = tuple(kept_endings)
+        self.max_distance = max_distance
+        self.configure()
+
+    def state(self) -> Tuple[Any, ...]:
+        """Plain-data form of the built index, for the compiled rule artifact"""
+        return self._known, self._stems, self._deletes, self._min_lengths, self._kept_endings, self.max_distance
+
+    @classmethod
+    def from_state(cls, state: Tuple[Any, ...]) -> 'TokenResolver':
+        resolver = cls.__new__(cls)
+        (resolver._known, resolver._stems, resolver._deletes, resolver._min_lengths,
+         resolver._kept_endings, resolver.max_distance) = state
+        resolver.configure()
+        return resolver
+
+    def configure(self, distance: Optional[int] = None, cache_size: int = DEFAULT_TOKEN_CACHE_SIZE):
+        """Set the edit distance (0 turns correction off) and start an empty memo of `cache_size` tokens"""
+        if distance is None:
+            distance = self.max_distance
+        if not 0 <= distance <= self.max_distance:
+            raise ValueError(f"fuzzy distance must be between 0 and {self.max_distance}")
+        self.distance = distance
+        self.cache_size = cache_size
+        self.stemmed = 0
+        self.corrected = 0
+        self.lookups = 0
+        self._memo = TokenMemo(self, cache_size)
+        self._lookup = self._memo.__getitem__
+
+    def _resolve(self, word: str) -> str:
+        if word in self._known:
+            return word
+        
+        stemmed = self._stems.get(light_stem(word)) or (len(word) > 3 and word.endswith('s') and self._stems.get(word[:-1]))
+        if stemmed:
+            self.stemmed += 1
+            return stemmed
+        
+        if (not self.distance or len(word) < self._min_lengths[0] or not word.isalpha()
+                or word.endswith(self._kept_endings)):
+            return word
+        best: Optional[str] = None
+        best_distance = self.distance + 1
+        tied = False
+        for delete in edit_deletes(word, self.distance):
+            for candidate in self._deletes.get(delete, ()):
+                if candidate == best:
+                    continue
+                distance = edit_distance(word, candidate, self.distance)
+                if distance < best_distance:
+                    best, best_distance, tied = candidate, distance, False
+                elif distance == best_distance:
+                    tied = True
+        if best is None or tied or len(word) < self._min_lengths[best_distance - 1]:
+            return word
+        self.corrected += 1
+        return best
+
+    def resolve(self, word: str) -> str:
+        """One (lowercase) word resolved"""
+        self.lookups += 1
+        return self._lookup(word)
+
+    def rewrite(self, text: str) -> str:
+        """(Lowercase) text with every word resolved"""
+        tokens = text.split(' ')
+        self.lookups += len(tokens)
+        return ' '.join(map(self._lookup, tokens))
+
+    def stats(self) -> Dict[str, int]:
+        """Memo hits and misses (tokens), and how many computed resolutions stemmed or corrected a word"""
+        misses = self._memo.misses
+        return {
+            'hits': self.lookups - misses,
+            'misses': misses,
+            'stemmed': self.stemmed,
+            'corrected': self.corrected,
+        }
+
+# ============================================================================
+# RULE PACK
+# ============================================================================
+
+# Bump when the shape of compile_rule_pack's output changes
+RULE_COMPILER_VERSION = 6
+
+RULE_PACK_KEYS = (
+    'version', 'critical_substitutions', 'ingredient_aliases', 'ingredient_lexicon', 'ingredient_groups',
+    'optional_line_markers', 'ignore_items', 'critical_ingredients', 'non_food_words', 'substitution_forms', 'fuzzy_matching',
+    'protected_contexts', 'protected_context_window', 'image_conflicts',
+)
+
+def rule_items(group: Any) -> Set[str]:
+    """Items of a rule list, or of a rule list split into named groups"""
+    if isinstance(group, dict):
+        return {item for items in group.values() for item in items}
+    return set(group)
+
+def phrase_words(phrases) -> Set[str]:
+    """Every word of a set of phrases"""
+    return {word for phrase in phrases for word in PHRASE_WORD_SEPARATOR.split(phrase.strip().lower())}
+
+def build_ingredient_vocabulary(alias_map: Dict[str, str], *phrase_sets) -> List[Tuple[str, str]]:
+    """(phrase, canonical) pairs for the tokenizer, in registration priority order"""
+    vocabulary = list(alias_map.items())
+    for phrases in phrase_sets:
+        vocabulary.extend((phrase, alias_map.get(phrase, phrase)) for phrase in sorted(phrases))
+    return vocabulary
+
+def compile_rule_pack(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """Build every lookup table, pattern and automaton the checks need from a rule pack"""
+    missing = [key for key in RULE_PACK_KEYS if key not in pack]
+    if missing:
+        raise ValueError(f"Rule pack is missing: {', '.join(missing)}")
+    
+    critical_substitutions = pack['critical_substitutions']
+    forbidden_ingredients = frozenset(
+        item for rules in critical_substitutions.values() for item in rules['forbidden']
+    )
+    
+    # Reverse alias map
+    alias_map = {}
+    for canonical, variants in pack['ingredient_aliases'].items():
+        alias_map[canonical] = canonical
+        for variant in variants:
+            alias_map[variant] = canonical
+    
+    ingredient_lexicon = frozenset(rule_items(pack['ingredient_lexicon']))
+    ignore_items = frozenset(rule_items(pack['ignore_items']))
+    critical_ingredients = frozenset(pack['critical_ingredients'])
+    protected_contexts = list(pack['protected_contexts'])
+    # Collective nouns ('greens', 'herbs') and the canonical ingredients each covers
+    ingredient_groups = {
+        group: frozenset(alias_map.get(member, member) for member in members)
+        for group, members in pack['ingredient_groups'].items()
+    }
+    
+    vocabulary = build_ingredient_vocabulary(alias_map, forbidden_ingredients, critical_ingredients,
+                                             ingredient_lexicon | set(ingredient_groups), ignore_items,
+                                             protected_contexts)
+    ingredient_trie = PhraseTrie(vocabulary)
+    
+    # Every canonical name the tokenizer can emit, with the names that count
+    # as using it in the instructions: itself, the known ingredients nested
+    # in it ('dark chocolate chips' → 'dark chocolate') and the collective
+    # nouns covering it ('spinach' → 'greens')
+    canonical_names = sorted({canonical for _, canonical in vocabulary})
+    ingredient_use_forms = {
+        name: frozenset(
+            {name}
+            | {form for form in ingredient_trie.find(name, nested=True) if form not in ignore_items}
+            | {group for group, members in ingredient_groups.items() if name in members}
+        )
+        for name in canonical_names
+    }
+    # The names ING_UNUSED may report
+    unused_candidates = frozenset(
+        name for name in canonical_names
+        if name not in ignore_items and name not in ingredient_groups and len(name) > 4
+    )
+    
+    # Ingredient lines ING_UNUSED never reports from: optional items,
+    # garnishes and serving suggestions
+    optional_line_pattern = re.compile(
+        r'\b(?:' + '|'.join(re.escape(marker) for marker in pack['optional_line_markers']) + r')\b'
+    )
+    
+    # Misspellings are only corrected towards ingredient names, never towards
+    # descriptors, units or health terms
+    fuzzy = pack['fuzzy_matching']
+    ingredient_words = (
+        {word for word in phrase_words(set(alias_map) | ingredient_lexicon) if word not in ignore_items}
+        | phrase_words(forbidden_ingredients | critical_ingredients)
+    )
+    token_resolver = TokenResolver(
+        phrase_words(phrase for phrase, _ in vocabulary), ingredient_words,
+        frozenset(pack['non_food_words']) | frozenset(fuzzy['kept_words']),
+        fuzzy['max_distance'], fuzzy['min_lengths'], fuzzy['kept_endings'],
+    )
+    
+    image_conflicts = [(conflict['high_gi'], conflict['low_gi']) for conflict in pack['image_conflicts']]
+    
+    # Single automaton for check D: every forbidden item plus every protected phrase
+    forbidden_phrases = sorted(forbidden_ingredients)
+    
+    return {
+        'version': pack['version'],
+        'critical_substitutions': critical_substitutions,
+        'forbidden_ingredients': forbidden_ingredients,
+        'ingredient_aliases': pack['ingredient_aliases'],
+        'alias_map': alias_map,
+        'ingredient_lexicon': ingredient_lexicon,
+        'ignore_items': ignore_items,
+        'critical_ingredients': critical_ingredients,
+        'non_food_words': frozenset(pack['non_food_words']),
+        'substitution_parser': SubstitutionParser(pack['substitution_forms']).state(),
+        'protected_contexts': protected_contexts,
+        'protected_context_window': pack['protected_context_window'],
+        'image_conflicts': image_conflicts,
+        'image_conflict_sets': [(frozenset(high_gi), frozenset(low_gi)) for high_gi, low_gi in image_conflicts],
+        'ingredient_use_forms': ingredient_use_forms,
+        'unused_candidates': unused_candidates,
+        'optional_line_pattern': optional_line_pattern,
+        'forbidden_phrases': forbidden_phrases,
+        'ingredient_trie': ingredient_trie.state(),
+        'token_resolver': token_resolver.state(),
+        'fuzzy_distance': fuzzy['distance'],
+        'critical_matcher': PhraseAutomaton(forbidden_phrases + protected_contexts).state(),
     }
-}
 
-# Build forbidden ingredients set for quick lookup
-FORBIDDEN_INGREDIENTS = set()
-for category, items in CRITICAL_SUBSTITUTIONS.items():
-    FORBIDDEN_INGREDIENTS.update(items['forbidden'])
-
-# Ingredient aliases (comprehensive mapping)
-INGREDIENT_ALIASES = {
-    'zucchini': ['courgette', 'zucchinis'],
-    'potato': ['potatoes', 'white potato'],
-    'sweet potato': ['yam', 'yams', 'sweet potatoes', 'sweetpotato'],
-    'chickpea': ['garbanzo', 'garbanzo beans', 'chickpeas', 'garbanzos'],
-    'bell pepper': ['capsicum', 'red pepper', 'green pepper', 'yellow pepper', 'bell peppers', 'sweet pepper'],
-    'scallion': ['green onion', 'spring onion', 'scallions', 'green onions', 'spring onions'],
-    'coriander': ['cilantro', 'fresh cilantro', 'coriander leaves'],
-    'aubergine': ['eggplant'],
-    'oatmeal': ['rolled oats', 'porridge oats', 'oats'],
-    'quinoa': ['quinua'],
-    'tomato': ['tomatoes'],
-    'onion': ['onions'],
-    'garlic': ['garlic cloves', 'clove garlic', 'garlic clove'],
-    'olive oil': ['extra virgin olive oil', 'evoo'],
-    'chicken': ['chicken breast', 'chicken breasts', 'chicken thighs'],
-    'salmon': ['salmon fillet', 'salmon fillets'],
-    'lemon': ['lemons', 'lemon juice'],
-    'lime': ['limes', 'lime juice'],
-}
+def rule_pack_source(path: str = RULE_PACK_FILE) -> Tuple[bytes, str]:
+    """The rule pack's bytes and their sha256"""
+    with open(path, 'rb') as f:
+        source = f.read()
+    return source, hashlib.sha256(source).hexdigest()
 
-# Build reverse alias map
-ALIAS_MAP = {}
-for canonical, variants in INGREDIENT_ALIASES.items():
-    ALIAS_MAP[canonical] = canonical
-    for variant in variants:
-        ALIAS_MAP[variant] = canonical
-
-# Comprehensive ignore/stopwords list
-IGNORE_ITEMS = {
-    # Common ingredients that don't need strict checking
-    'water', 'salt', 'pepper', 'black pepper', 'sea salt', 'kosher salt',
-    'oil', 'cooking spray', 'olive oil',
-    
-    # Descriptors and modifiers (from stopwords config)
-    'fresh', 'dried', 'optional', 'to taste', 'chopped', 'sliced', 
-    'ground', 'organic', 'raw', 'cooked', 'minced', 'diced',
-    'small', 'medium', 'large',
-    
-    # Additional common descriptors
-    'and', 'or', 'the', 'a', 'an', 'in', 'to', 'for', 'with', 'on', 'at',
-    'from', 'by', 'frozen', 'canned',
-    
-    # Units
-    'cup', 'cups', 'tablespoon', 'tablespoons', 'teaspoon', 'teaspoons',
-    'tbsp', 'tsp', 'oz', 'lb', 'lbs', 'gram', 'grams', 'ml', 'kg',
-    'pinch', 'dash', 'handful', 'slice', 'slices', 'piece', 'pieces',
-    
-    # Medical/health terms that aren't ingredients
-    'blood', 'sugar', 'glucose', 'insulin', 'diabetes', 'glycemic',
-    'carbohydrate', 'carbohydrates', 'protein', 'fiber', 'nutrients',
-    'metabolism', 'health', 'healthy', 'nutrition', 'nutritional',
-    'benefits', 'compounds', 'antioxidants', 'vitamins', 'minerals',
-    
-    # Cooking terms
-    'baking', 'cooking', 'roasting', 'grilling', 'sauteing', 'boiling',
-    'method', 'methods', 'technique', 'techniques', 'preparation',
-    
-    # General descriptive words
-    'traditional', 'classic', 'authentic', 'delicious', 'perfect',
-    'excellent', 'superior', 'optimal', 'quality', 'premium',
-}
+def write_rule_artifact(path: str = RULE_PACK_FILE, artifact: str = RULE_ARTIFACT_FILE) -> Dict[str, Any]:
+    """Compile a rule pack and save it for load_rule_pack; returns the compiled rules.
 
-# Critical ingredients to flag (high-GI items that shouldn't appear in low-GI recipes)
-CRITICAL_INGREDIENTS = {
-    'potato', 'potatoes', 'rice', 'pasta', 'bread', 'cream', 'butter', 
-    'cheese', 'sugar', 'honey', 'maple syrup'
-}
+    The artifact is a one-line JSON header (compiler version and the pack's
+    sha256) followed by the pickled rules, so a reader can tell whether it
+    is current without unpickling anything.
+    """
+    source, digest = rule_pack_source(path)
+    rules = compile_rule_pack(json.loads(source))
+    rules['source_digest'] = digest
+    header = json.dumps({'compiler': RULE_COMPILER_VERSION, 'source_digest': digest})
+    
+    # Atomic replace, so a concurrent run never reads half an artifact
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(artifact)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.encode('utf-8') + b'\n')
+            pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, artifact)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return rules
 
-# Substitution pattern regex
-SUBSTITUTION_PATTERNS = [
-    # Match: "use X instead of Y", "substitute X for Y"
-    r'(?i)\b(?:use|using|substitute|swap|replace)\s+([a-z\s-]+?)\s+(?:instead\s+of|for)\s+([a-z\s-]+?)(?:\s|,|\.|;|$)',
-    # Match: "X instead of Y"
-    r'(?i)\b([a-z\s-]+?)\s+instead\s+of\s+([a-z\s-]+?)(?:\s|,|\.|;|$)',
-    # Match: "replace Y with X"
-    r'(?i)\breplace\s+([a-z\s-]+?)\s+with\s+([a-z\s-]+?)(?:\s|,|\.|;|$)',
-]
+def read_rule_artifact(artifact: str, digest: str) -> Optional[Dict[str, Any]]:
+    """Compiled rules from the artifact, or None unless it matches the pack and is safe to load.
+
+    The header is checked before the pickle is touched. The file must also
+    be owned by this user (or root) and writable by nobody else, since
+    unpickling runs code.
+    """
+    try:
+        with open(artifact, 'rb') as f:
+            info = os.fstat(f.fileno())
+            if info.st_uid not in (os.getuid(), 0) or info.st_mode & 0o022:
+                return None
+            header = json.loads(f.readline())
+            if header != {'compiler': RULE_COMPILER_VERSION, 'source_digest': digest}:
+                return None
+            return pickle.load(f)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+
+def load_rule_pack(path: str = RULE_PACK_FILE, artifact: str = RULE_ARTIFACT_FILE) -> Dict[str, Any]:
+    """Compiled rules for a rule pack.
+
+    Uses the artifact from --compile-rules when it was built from these exact
+    pack bytes by this compiler version; otherwise compiles the pack in
+    memory. Never writes anything.
+    """
+    source, digest = rule_pack_source(path)
+    rules = read_rule_artifact(artifact, digest)
+    if rules is None:
+        rules = compile_rule_pack(json.loads(source))
+        rules['source_digest'] = digest
+    return rules
+
+RULES = load_rule_pack()
+RULE_PACK_VERSION = RULES['version']
+
+# Rule tables read by the checks
+CRITICAL_SUBSTITUTIONS = RULES['critical_substitutions']
+FORBIDDEN_INGREDIENTS = RULES['forbidden_ingredients']
+INGREDIENT_ALIASES = RULES['ingredient_aliases']
+ALIAS_MAP = RULES['alias_map']
+INGREDIENT_LEXICON = RULES['ingredient_lexicon']
+IGNORE_ITEMS = RULES['ignore_items']
+CRITICAL_INGREDIENTS = RULES['critical_ingredients']
+NON_FOOD_WORDS = RULES['non_food_words']
+PROTECTED_CONTEXTS = RULES['protected_contexts']
+PROTECTED_CONTEXT_WINDOW = RULES['protected_context_window']
+IMAGE_CONFLICTS = RULES['image_conflicts']
+IMAGE_CONFLICT_SETS = RULES['image_conflict_sets']
+INGREDIENT_USE_FORMS = RULES['ingredient_use_forms']
+UNUSED_CANDIDATES = RULES['unused_candidates']
+OPTIONAL_LINE_PATTERN = RULES['optional_line_pattern']
+
+INGREDIENT_TRIE = PhraseTrie.from_state(RULES['ingredient_trie'])
+FORBIDDEN_PHRASES = RULES['forbidden_phrases']
+CRITICAL_MATCHER = PhraseAutomaton.from_state(RULES['critical_matcher'])
+SUBSTITUTION_PARSER = SubstitutionParser.from_state(RULES['substitution_parser'])
+TOKEN_RESOLVER = TokenResolver.from_state(RULES['token_resolver'])
+TOKEN_RESOLVER.configure(RULES['fuzzy_distance'])
 
 # ============================================================================
 # NORMALIZATION UTILITIES
@@ -140,128 +808,192 @@ def normalize_text(text: str) -> str:
         return ""
     return text.lower().strip()
 
+QUANTITY_PATTERN = re.compile(r'\d+(?:\.\d+)?(?:/\d+)?')
+UNIT_PATTERN = re.compile(r'\b(?:cup|tbsp|tsp|oz|lb|gram|ml|kg)s?\b', re.IGNORECASE)
+FILENAME_WORD_PATTERN = re.compile(r'[a-z]+')
+
 def is_food_ingredient(word: str) -> bool:
     """Check if a word is likely a food ingredient vs descriptive text"""
     if word in IGNORE_ITEMS:
         return False
     if len(word) < 3:
         return False
-    # Filter out common non-ingredient words
-    non_food_words = {
-        'which', 'while', 'where', 'when', 'what', 'that', 'this', 'these',
-        'those', 'them', 'their', 'there', 'here', 'have', 'has', 'had',
-        'instead', 'using', 'used', 'make', 'makes', 'made', 'add', 'adds',
-        'serve', 'serves', 'serving', 'cook', 'cooks', 'cooking',
-        'provides', 'supports', 'reduces', 'helps', 'maintains',
-    }
-    return word not in non_food_words
+    return word not in NON_FOOD_WORDS
+
+def resolve_text(text: str) -> str:
+    """Normalized text with plurals and misspellings resolved to the vocabulary's spelling"""
+    return TOKEN_RESOLVER.rewrite(normalize_text(text))
 
 def tokenize_ingredients(text: str) -> Set[str]:
-    """Extract food words from text, normalized"""
-    # Extract multi-word phrases up to 3 words
-    words = re.findall(r'\b[a-z]{3,}(?:\s+[a-z]{3,}){0,2}\b', normalize_text(text))
-    
-    # Filter and apply aliases
-    result = set()
-    for word in words:
-        word = word.strip()
-        if not is_food_ingredient(word):
-            continue
-        # Apply alias mapping
-        canonical = ALIAS_MAP.get(word, word)
-        if canonical not in IGNORE_ITEMS:
-            result.add(canonical)
+    """Extract known ingredient names from text, canonicalized via ALIAS_MAP"""
+    return {
+        canonical for canonical in INGREDIENT_TRIE.find(resolve_text(text))
+        if canonical not in IGNORE_ITEMS
+    }
+
+def resolve_ingredient_lines(ingredients_list: List[str]) -> List[str]:
+    """Lowercased ingredient lines with plurals and misspellings resolved"""
+    return [TOKEN_RESOLVER.rewrite(ingredient.lower()) if ingredient else '' for ingredient in ingredients_list]
+
+def ingredient_line_names(line: str) -> Set[str]:
+    """Normalized ingredient names in one resolved ingredient line"""
+    # Remove quantities and units
+    text = QUANTITY_PATTERN.sub('', line)
+    text = UNIT_PATTERN.sub('', text)
     
-    return result
+    # Extract known ingredients; forbidden items are kept even when they
+    # are also ignore words (e.g. 'sugar')
+    return {
+        canonical for canonical in INGREDIENT_TRIE.find(text)
+        if canonical in FORBIDDEN_INGREDIENTS or canonical not in IGNORE_ITEMS
+    }
 
-def extract_ingredient_names(ingredients_list: List[str]) -> Set[str]:
-    """Extract normalized ingredient names from ingredient list"""
+def extract_ingredient_names(ingredients_list: List[str], resolved: bool = False) -> Set[str]:
+    """Extract normalized ingredient names from ingredient list (or from resolve_ingredient_lines output)"""
+    if not resolved:
+        ingredients_list = resolve_ingredient_lines(ingredients_list)
     names = set()
     for ingredient in ingredients_list:
-        if not ingredient:
-            continue
-        ingredient_lower = normalize_text(ingredient)
-        
-        # Check for forbidden ingredients (exact match or contains)
-        for forbidden in FORBIDDEN_INGREDIENTS:
-            if forbidden in ingredient_lower:
-                names.add(forbidden)
-        
-        # Remove quantities and units
-        text = re.sub(r'\d+(?:\.\d+)?(?:/\d+)?', '', ingredient)
-        text = re.sub(r'\b(?:cup|tbsp|tsp|oz|lb|gram|ml|kg)s?\b', '', text, flags=re.IGNORECASE)
-        
-        # Extract words
-        tokens = tokenize_ingredients(text)
-        names.update(tokens)
-    
+        if ingredient:
+            names |= ingredient_line_names(ingredient)
     return names
 
 def extract_substitutions(description: str) -> List[Tuple[str, str]]:
     """Extract (new_ingredient, old_ingredient) substitution pairs from description"""
+    return [(new_item, old_item) for new_item, old_item, _ in described_substitutions(description)]
+
+def described_substitutions(description: str) -> List[Tuple[str, str, str]]:
+    """(new_ingredient, old_ingredient, new_phrase) substitutions in a description.
+
+    new_phrase is the new ingredient as the description words it
+    ('cauliflower rice'), before aliases map it to a canonical name.
+    """
     if not description:
         return []
     
     substitutions = []
-    desc_lower = normalize_text(description)
     
-    for pattern in SUBSTITUTION_PATTERNS:
-        matches = re.finditer(pattern, desc_lower)
-        for match in matches:
-            new_item = match.group(1).strip()
-            old_item = match.group(2).strip()
-            
-            # Clean up
-            new_words = [w for w in new_item.split() if is_food_ingredient(w)]
-            old_words = [w for w in old_item.split() if is_food_ingredient(w)]
+    for new_words, old_word in SUBSTITUTION_PARSER.parse(normalize_text(description)):
+        # Clean up
+        new_words = [TOKEN_RESOLVER.resolve(w) for w in new_words if is_food_ingredient(w)]
+        old_word = TOKEN_RESOLVER.resolve(old_word)
+        
+        new_item = ' '.join(new_words) if new_words else ''
+        old_item = old_word if is_food_ingredient(old_word) else ''
+        
+        if new_item and old_item and len(new_item) > 2 and len(old_item) > 2:
+            new_phrase = new_item
             
-            new_item = ' '.join(new_words) if new_words else ''
-            old_item = ' '.join(old_words) if old_words else ''
+            # Apply aliases
+            new_item = ALIAS_MAP.get(new_item, new_item)
+            old_item = ALIAS_MAP.get(old_item, old_item)
             
-            if new_item and old_item and len(new_item) > 2 and len(old_item) > 2:
-                # Apply aliases
-                new_item = ALIAS_MAP.get(new_item, new_item)
-                old_item = ALIAS_MAP.get(old_item, old_item)
-                
-                # Only include if both are actual food items
-                if (new_item in CRITICAL_INGREDIENTS or old_item in CRITICAL_INGREDIENTS or
-                    new_item not in IGNORE_ITEMS or old_item not in IGNORE_ITEMS):
-                    substitutions.append((new_item, old_item))
+            # Only include if both are actual food items
+            if (new_item in CRITICAL_INGREDIENTS or old_item in CRITICAL_INGREDIENTS or
+                new_item not in IGNORE_ITEMS or old_item not in IGNORE_ITEMS):
+                substitutions.append((new_item, old_item, new_phrase))
     
     return substitutions
 
+# ============================================================================
+# RECIPE ANALYSIS
+# ============================================================================
+
+class RecipeAnalysis:
+    """Per-recipe parsing shared by every check.
+
+    Built once per recipe: the text normalisation, ingredient-name
+    extraction, instruction tokenisation, substitution parsing and filename
+    tokenising that the checks used to repeat independently. Every field is
+    computed up front in the constructor, since every recipe runs all the
+    checks; only the instruction mentions are skipped (left empty) when the
+    recipe has no ingredients or no instructions.
+    """
+
+    __slots__ = (
+        'description', 'ingredients', 'instructions', 'image_url',
+        'ingredient_names', 'required_line_names', 'instruction_mentions', 'instruction_phrases', 'substitutions',
+        'filename', 'filename_base', 'filename_words', 'critical_text',
+    )
+
+    def __init__(self, recipe: Dict[str, Any]):
+        self.description = recipe.get('description', '') or ''
+        self.ingredients = recipe.get('ingredients', []) or []
+        self.instructions = recipe.get('instructions', '') or ''
+        self.image_url = recipe.get('image_url', '') or ''
+        
+        # Each text is lowercased and resolved once, for every check
+        ingredient_lines = resolve_ingredient_lines(self.ingredients)
+        instructions_text = TOKEN_RESOLVER.rewrite(self.instructions.lower())
+        
+        line_names = [ingredient_line_names(line) if line else set() for line in ingredient_lines]
+        self.ingredient_names = set().union(*line_names)
+        # Names per ingredient line that should show up in the instructions
+        self.required_line_names = [
+            names for line, names in zip(ingredient_lines, line_names)
+            if names and not OPTIONAL_LINE_PATTERN.search(line)
+        ]
+        
+        self.instruction_mentions: Set[str] = set()
+        self.instruction_phrases: Set[str] = set()
+        if self.ingredients and self.instructions:
+            self.instruction_mentions = {
+                canonical for canonical in INGREDIENT_TRIE.find(instructions_text)
+                if canonical not in IGNORE_ITEMS
+            }
+            # Every known phrase, including ones nested in longer phrases or
+            # hyphenated compounds ('tahini-lemon dressing' uses the lemon)
+            self.instruction_phrases = set(INGREDIENT_TRIE.find(instructions_text.replace('-', ' '), nested=True))
+        
+        self.substitutions = extract_substitutions(self.description)
+        
+        self.filename = os.path.basename(self.image_url).lower()
+        self.filename_base = os.path.splitext(self.filename)[0]
+        # 'rice' in 'cauliflower_rice_bowl' is not a rice image
+        filename_words = [TOKEN_RESOLVER.resolve(word) for word in FILENAME_WORD_PATTERN.findall(self.filename_base)]
+        self.filename_words = set(INGREDIENT_TRIE.standalone(filename_words))
+        
+        # Ingredients and instructions for the low-GI check (NEVER descriptions)
+        self.critical_text = (' '.join(ingredient_lines) + ' ' + instructions_text).strip()
+
 # ============================================================================
 # CHECK A: Description ↔ Ingredients
 # ============================================================================
 
-def check_description_ingredients(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
-    """Check for description-ingredient inconsistencies"""
-    issues = []
-    
-    description = recipe.get('description', '') or ''
-    ingredients = recipe.get('ingredients', []) or []
-    
-    if not description:
-        return issues
-    
-    ingredient_names = extract_ingredient_names(ingredients)
-    substitutions = extract_substitutions(description)
+def substitution_conflicts(analysis: RecipeAnalysis) -> List[Tuple[str, str]]:
+    """(new, old) substitutions the description promises but the ingredients contradict"""
+    conflicts = []
+    ingredient_names = analysis.ingredient_names
     
     # Check substitution conflicts - only for actual food items
-    for new_item, old_item in substitutions:
+    for new_item, old_item in analysis.substitutions:
         # Only flag if these are recognized food ingredients
         if new_item in CRITICAL_INGREDIENTS or old_item in CRITICAL_INGREDIENTS:
             has_new = new_item in ingredient_names
             has_old = old_item in ingredient_names
             
             if has_old and not has_new:
-                issues.append({
-                    'code': 'DESC_SUB_CONFLICT',
-                    'severity': 'P0',
-                    'where': 'description+ingredients',
-                    'evidence': f"Description says '{new_item} instead of {old_item}' but ingredients still contain '{old_item}'",
-                    'fix': f"Replace {old_item} with {new_item} in ingredients list"
-                })
+                conflicts.append((new_item, old_item))
+    
+    return conflicts
+
+def check_description_ingredients(recipe: Dict[str, Any],
+                                  analysis: Optional[RecipeAnalysis] = None) -> List[Dict[str, str]]:
+    """Check for description-ingredient inconsistencies"""
+    issues = []
+    analysis = analysis or RecipeAnalysis(recipe)
+    
+    if not analysis.description:
+        return issues
+    
+    for new_item, old_item in substitution_conflicts(analysis):
+        issues.append({
+            'code': 'DESC_SUB_CONFLICT',
+            'severity': 'P0',
+            'where': 'description+ingredients',
+            'evidence': f"Description says '{new_item} instead of {old_item}' but ingredients still contain '{old_item}'",
+            'fix': f"Replace {old_item} with {new_item} in ingredients list"
+        })
     
     return issues
 
@@ -269,18 +1001,22 @@ def check_description_ingredients(recipe: Dict[str, Any]) -> List[Dict[str, str]
 # CHECK B: Ingredients ↔ Instructions
 # ============================================================================
 
-def check_ingredients_instructions(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
+# Checks B and C stay on per-recipe frozensets. A batch mode encoding each
+# recipe's sets as NumPy bitsets was tried and was slower: the sets hold a
+# dozen names, so packing them into bit rows costs more than the set
+# operations it replaces, and they are transient, so nothing is saved in memory.
+
+def check_ingredients_instructions(recipe: Dict[str, Any],
+                                   analysis: Optional[RecipeAnalysis] = None) -> List[Dict[str, str]]:
     """Check for ingredient-instruction inconsistencies"""
     issues = []
+    analysis = analysis or RecipeAnalysis(recipe)
     
-    ingredients = recipe.get('ingredients', []) or []
-    instructions = recipe.get('instructions', '') or ''
-    
-    if not ingredients or not instructions:
+    if not analysis.ingredients or not analysis.instructions:
         return issues
     
-    ingredient_names = extract_ingredient_names(ingredients)
-    instruction_mentions = tokenize_ingredients(instructions)
+    ingredient_names = analysis.ingredient_names
+    instruction_mentions = analysis.instruction_mentions
     
     # Find ghost ingredients (CRITICAL only)
     ghost = instruction_mentions - ingredient_names
@@ -295,9 +1031,17 @@ def check_ingredients_instructions(recipe: Dict[str, Any]) -> List[Dict[str, str
             'fix': f"Add {', '.join(sorted(critical_ghost))} to ingredients or remove from instructions"
         })
     
-    # Find unused ingredients (less critical)
-    unused = ingredient_names - instruction_mentions
-    unused = {i for i in unused if i not in IGNORE_ITEMS and len(i) > 4}
+    # Find unused ingredients (less critical), a line at a time: a line is
+    # used when the instructions name any of its ingredients, a known
+    # ingredient nested in one, or a collective noun covering one, so
+    # alternatives ('ghee or coconut oil') and examples ('fresh herbs
+    # (parsley, basil)') are not reported on their own
+    instruction_phrases = analysis.instruction_phrases
+    unused = set()
+    for names in analysis.required_line_names:
+        if any(not INGREDIENT_USE_FORMS[name].isdisjoint(instruction_phrases) for name in names):
+            continue
+        unused.update(names & UNUSED_CANDIDATES)
     
     if unused and len(unused) <= 3:
         issues.append({
@@ -314,15 +1058,13 @@ def check_ingredients_instructions(recipe: Dict[str, Any]) -> List[Dict[str, str
 # CHECK C: Image ↔ Recipe
 # ============================================================================
 
-def check_image_recipe(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
+def check_image_recipe(recipe: Dict[str, Any],
+                       analysis: Optional[RecipeAnalysis] = None) -> List[Dict[str, str]]:
     """Check for image-recipe inconsistencies (lightweight heuristics)"""
     issues = []
+    analysis = analysis or RecipeAnalysis(recipe)
     
-    name = recipe.get('name', '') or ''
-    image_url = recipe.get('image_url', '') or ''
-    ingredients = recipe.get('ingredients', []) or []
-    
-    if not image_url:
+    if not analysis.image_url:
         issues.append({
             'code': 'IMG_MISSING',
             'severity': 'P1',
@@ -332,9 +1074,8 @@ def check_image_recipe(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
         })
         return issues
     
-    # Extract filename
-    filename = os.path.basename(image_url).lower()
-    filename_base = os.path.splitext(filename)[0]
+    filename = analysis.filename
+    filename_base = analysis.filename_base
     
     # Check if generic timestamp filename
     if filename.startswith('image_') and filename_base.replace('image_', '').replace('_', '').isdigit():
@@ -347,21 +1088,14 @@ def check_image_recipe(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
         })
     
     # Check for conflicting ingredients in filename
-    ingredient_names = extract_ingredient_names(ingredients)
-    filename_words = set(re.findall(r'[a-z]+', filename_base))
-    
-    # Common conflicting pairs for low-glycemic recipes
-    conflicts = [
-        (['potato', 'potatoes'], ['zucchini', 'cauliflower']),
-        (['rice'], ['cauliflower', 'quinoa']),
-        (['pasta'], ['zucchini', 'spaghetti']),
-        (['bread'], ['lettuce', 'almond']),
-    ]
+    ingredient_names = analysis.ingredient_names
+    filename_words = analysis.filename_words
     
-    for high_gi, low_gi in conflicts:
-        has_high_in_filename = any(word in filename_words for word in high_gi)
-        has_low_in_ingredients = any(ing in ingredient_names for ing in low_gi)
-        has_high_in_ingredients = any(ing in ingredient_names for ing in high_gi)
+    # Conflicting high-GI / low-GI pairs from the rule pack
+    for (high_gi, low_gi), (high_set, low_set) in zip(IMAGE_CONFLICTS, IMAGE_CONFLICT_SETS):
+        has_high_in_filename = not high_set.isdisjoint(filename_words)
+        has_low_in_ingredients = not low_set.isdisjoint(ingredient_names)
+        has_high_in_ingredients = not high_set.isdisjoint(ingredient_names)
         
         if has_high_in_filename and has_low_in_ingredients and not has_high_in_ingredients:
             issues.append({
@@ -378,55 +1112,63 @@ def check_image_recipe(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
 # CHECK D: Critical Substitutions (Low-GI Compliance)
 # ============================================================================
 
-def check_critical_substitutions(recipe: Dict[str, Any]) -> List[Dict[str, str]]:
+def find_forbidden(text: str) -> Tuple[Dict[str, List[Tuple[int, int]]], Callable[[int, int], bool]]:
+    """Whole-word spans of every forbidden item in (lowercase) text, and a test for protected spans"""
+    size = len(text)
+    
+    # One pass finds every forbidden item and every protected phrase
+    forbidden_count = len(FORBIDDEN_PHRASES)
+    hits: Dict[str, List[Tuple[int, int]]] = {}
+    protected_spans = []
+    for start, end, index in CRITICAL_MATCHER.find_all(text):
+        if index >= forbidden_count:
+            protected_spans.append((start, end))
+        elif ((start == 0 or not is_word_char(text[start - 1])) and
+              (end == size or not is_word_char(text[end]))):
+            hits.setdefault(FORBIDDEN_PHRASES[index], []).append((start, end))
+    protected_spans.sort()
+    protected_starts = [start for start, _ in protected_spans]
+    
+    def is_protected(start: int, end: int) -> bool:
+        """True if a protected phrase lies entirely within the match's context window"""
+        window_start = start - PROTECTED_CONTEXT_WINDOW
+        window_end = end + PROTECTED_CONTEXT_WINDOW
+        for i in range(bisect_left(protected_starts, window_start), len(protected_spans)):
+            span_start, span_end = protected_spans[i]
+            if span_start > window_end:
+                break
+            if span_end <= window_end:
+                return True
+        return False
+    
+    return hits, is_protected
+
+def forbidden_where(category: str) -> str:
+    """The `where` of a category's FORBIDDEN_INGREDIENT issue"""
+    return f'ingredients+instructions ({category})'
+
+def check_critical_substitutions(recipe: Dict[str, Any],
+                                 analysis: Optional[RecipeAnalysis] = None) -> List[Dict[str, str]]:
     """Check if recipe uses forbidden high-GI ingredients instead of allowed alternatives"""
     issues = []
+    analysis = analysis or RecipeAnalysis(recipe)
     
-    ingredients = recipe.get('ingredients', []) or []
-    instructions = recipe.get('instructions', '') or ''
-    
-    # Combine ingredients and instructions for comprehensive check (NEVER descriptions)
-    all_text = ' '.join(ingredients) + ' ' + instructions
-    all_text_lower = normalize_text(all_text)
-    
-    # Protected medical/health phrases that should NOT trigger violations
-    protected_contexts = [
-        'blood sugar',
-        'blood sugar stabilization',
-        'blood sugar levels',
-        'blood sugar control',
-        'blood sugar spike',
-        'blood sugar management',
-    ]
+    hits, is_protected = find_forbidden(analysis.critical_text)
     
     # Check each substitution category
     for category, rules in CRITICAL_SUBSTITUTIONS.items():
         forbidden_found = []
         
-        # Check for forbidden ingredients
         for forbidden_item in rules['forbidden']:
-            # Use word boundary to avoid partial matches
-            pattern = r'\b' + re.escape(forbidden_item) + r'\b'
-            matches = list(re.finditer(pattern, all_text_lower))
-            
-            for match in matches:
-                # Check if this match is in a protected context
-                is_protected = False
-                
-                # Get context around the match (50 chars before and after)
-                context_start = max(0, match.start() - 50)
-                context_end = min(len(all_text_lower), match.end() + 50)
-                context = all_text_lower[context_start:context_end]
-                
-                # Check if any protected phrase appears in this context
-                for protected in protected_contexts:
-                    if protected in context:
-                        is_protected = True
-                        break
-                
-                # Only flag if not in protected context
-                if not is_protected and forbidden_item not in forbidden_found:
+            # Matches of a single item never overlap (same as re.finditer)
+            last_end = -1
+            for start, end in sorted(hits.get(forbidden_item, ())):
+                if start < last_end:
+                    continue
+                last_end = end
+                if not is_protected(start, end):
                     forbidden_found.append(forbidden_item)
+                    break
         
         # Flag if forbidden items found
         if forbidden_found:
@@ -436,7 +1178,7 @@ def check_critical_substitutions(recipe: Dict[str, Any]) -> List[Dict[str, str]]
             issues.append({
                 'code': 'FORBIDDEN_INGREDIENT',
                 'severity': 'P0',
-                'where': f'ingredients+instructions ({category})',
+                'where': forbidden_where(category),
                 'evidence': f"Recipe contains forbidden {category}: {', '.join(forbidden_found)}",
                 'fix': f"Replace with low-GI alternative: {alternatives}"
             })
@@ -447,144 +1189,2755 @@ def check_critical_substitutions(recipe: Dict[str, Any]) -> List[Dict[str, str]]
 # MAIN CHECKER
 # ============================================================================
 
-def check_recipe(recipe: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Run all checks on a recipe and return list of issues"""
+# Only the columns the checks read
+RECIPE_COLUMNS = [
+    'id', 'name', 'description', 'category', 'ingredients', 'instructions', 'image_url', 'image_version',
+    'glycemic_index', 'glycemic_value', 'carbohydrates', 'calories', 'protein', 'fat', 'fiber',
+]
+
+RECIPE_QUERY = f"""
+    SELECT {', '.join(RECIPE_COLUMNS)}
+    FROM meals
+    ORDER BY name
+"""
+
+# Rows per round trip when streaming from a server-side cursor
+DEFAULT_BATCH_SIZE = 2000
+
+# Per-recipe checks, in report order. Each takes (recipe, analysis) and
+# should read parsed fields from the shared RecipeAnalysis.
+RECIPE_CHECKS = [
+    check_description_ingredients,
+    check_ingredients_instructions,
+    check_image_recipe,
+    check_critical_substitutions,
+]
+
+def run_checks(recipe: Dict[str, Any], metrics: Optional['CheckMetrics'] = None) -> List[Dict[str, str]]:
+    """Run all checks on a recipe and return its issues without recipe metadata.
+
+    With `metrics`, the analysis stage, every check and the whole recipe are
+    timed and recorded, along with the recipe's word-resolution lookups.
+    """
     all_issues = []
     
-    # Run all checks
-    all_issues.extend(check_description_ingredients(recipe))
-    all_issues.extend(check_ingredients_instructions(recipe))
-    all_issues.extend(check_image_recipe(recipe))
-    all_issues.extend(check_critical_substitutions(recipe))
+    if metrics is None:
+        analysis = RecipeAnalysis(recipe)
+        for check in RECIPE_CHECKS:
+            all_issues.extend(check(recipe, analysis))
+        return all_issues
+    
+    clock = time.perf_counter
+    tokens_before = TOKEN_RESOLVER.stats()
+    recipe_start = clock()
+    analysis = RecipeAnalysis(recipe)
+    stage_end = clock()
+    metrics.observe('analysis', stage_end - recipe_start, 0)
+    for check in RECIPE_CHECKS:
+        stage_start = stage_end
+        found = check(recipe, analysis)
+        stage_end = clock()
+        metrics.observe(check.__name__, stage_end - stage_start, len(found))
+        all_issues.extend(found)
+    metrics.observe_recipe(recipe['id'], stage_end - recipe_start, len(all_issues))
+    metrics.observe_tokens(tokens_before, TOKEN_RESOLVER.stats())
     
-    # Add recipe metadata to each issue
-    for issue in all_issues:
+    return all_issues
+
+def annotate_issues(recipe: Dict[str, Any], issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add recipe metadata to each issue"""
+    for issue in issues:
         issue['recipe_id'] = recipe['id']
         issue['title'] = recipe['name']
         issue['category'] = recipe.get('category', '')
-        issue['updated_at'] = datetime.now().isoformat()
     
-    return all_issues
+    return issues
 
-def main():
-    """Main function"""
-    print("🔍 GlycoGuide Production Recipe Consistency Checker")
-    print("=" * 70)
-    
-    # Connect to database
-    database_url = os.environ.get('DATABASE_URL')
-    if not database_url:
-        print("❌ ERROR: DATABASE_URL not set")
-        sys.exit(1)
-    
-    conn = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
-    cursor = conn.cursor()
-    
-    # Fetch all recipes
-    print("\n📥 Fetching recipes from database...")
-    cursor.execute("""
-        SELECT id, name, description, category, ingredients, instructions, image_url
-        FROM meals
-        ORDER BY name
-    """)
-    
-    recipes = cursor.fetchall()
-    print(f"✅ Found {len(recipes)} recipes")
-    
-    # Run checks
-    print("\n🔎 Running consistency checks...")
-    print("   ✓ Description ↔ Ingredients")
-    print("   ✓ Ingredients ↔ Instructions")
-    print("   ✓ Image ↔ Recipe content")
-    print("   ✓ Critical substitutions (low-GI compliance)")
-    
-    all_issues = []
-    
-    for recipe in recipes:
-        issues = check_recipe(dict(recipe))
-        all_issues.extend(issues)
-    
-    # Sort by severity
-    severity_order = {'P0': 0, 'P1': 1, 'P2': 2}
-    all_issues.sort(key=lambda x: (severity_order.get(x['severity'], 3), x['title']))
-    
-    # Count by severity and issue type
-    p0_count = len([i for i in all_issues if i['severity'] == 'P0'])
-    p1_count = len([i for i in all_issues if i['severity'] == 'P1'])
-    p2_count = len([i for i in all_issues if i['severity'] == 'P2'])
-    
-    forbidden_count = len([i for i in all_issues if i['code'] == 'FORBIDDEN_INGREDIENT'])
-    ghost_count = len([i for i in all_issues if i['code'] == 'STEP_GHOST_ING'])
-    
-    # Generate CSV report
-    output_file = 'scripts/audit_reports/recipe_consistency_report.csv'
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['severity', 'recipe_id', 'title', 'category', 'issue_code', 'where', 'evidence', 'suggested_fix', 'updated_at']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for issue in all_issues:
-            writer.writerow({
-                'severity': issue['severity'],
-                'recipe_id': issue['recipe_id'],
-                'title': issue['title'],
-                'category': issue['category'],
-                'issue_code': issue['code'],
-                'where': issue['where'],
-                'evidence': issue['evidence'],
-                'suggested_fix': issue['fix'],
-                'updated_at': issue['updated_at']
-            })
-    
-    # Print summary
-    print("\n" + "=" * 70)
-    print("📊 CONSISTENCY CHECK RESULTS")
-    print("=" * 70)
-    print(f"\n✅ Total recipes analyzed: {len(recipes)}")
-    print(f"⚠️  Total issues found: {len(all_issues)}")
-    print(f"\n🚨 P0 Critical: {p0_count}")
-    print(f"   - Forbidden ingredients (low-GI violations): {forbidden_count}")
-    print(f"   - Ghost ingredients in instructions: {ghost_count}")
-    print(f"⚠️  P1 High: {p1_count}")
-    print(f"📋 P2 Medium: {p2_count}")
-    
-    # Show P0 issues by type
-    if p0_count > 0:
-        print("\n" + "=" * 70)
-        print("🚨 P0 CRITICAL ISSUES (Immediate Action Required)")
-        print("=" * 70)
+def check_recipe(recipe: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run all checks on a recipe and return list of issues"""
+    return annotate_issues(recipe, run_checks(recipe))
+
+# ============================================================================
+# INCREMENTAL RESULT CACHE
+# ============================================================================
+
+# Bump whenever check logic changes in a way the rule pack doesn't capture
+RULESET_VERSION = 5
+
+CACHE_FILE = 'scripts/audit_reports/.recipe_consistency_cache.sqlite'
+
+# Re-checked results written per cache transaction
+CACHE_WRITE_BATCH = 1000
+
+# Recipe columns that feed the checks; any change to one forces a re-check
+HASHED_FIELDS = ('name', 'description', 'ingredients', 'instructions', 'image_url')
+
+def ruleset_fingerprint() -> str:
+    """Hash of the check-logic version, the exact rule pack and the fuzzy distance in use"""
+    payload = json.dumps({
+        'version': RULESET_VERSION,
+        'rule_pack_version': RULE_PACK_VERSION,
+        'rule_pack_digest': RULES['source_digest'],
+        'fuzzy_distance': TOKEN_RESOLVER.distance,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def recipe_content_hash(recipe: Dict[str, Any], fingerprint: str) -> str:
+    """Hash of the checked recipe content under a given rule set"""
+    payload = json.dumps(
+        [fingerprint] + [recipe.get(field) for field in HASHED_FIELDS],
+        ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """Persistent per-recipe check results keyed on recipe id + content hash.
+
+    Unchanged recipes reuse their stored issues; changed and new recipes are
+    re-checked and stored; `purge_unseen()` drops recipes that were not part
+    of the run (deleted from meals).
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fingerprint = ruleset_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[Tuple[str, str, str]] = []
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS recipe_results (
+                recipe_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                issues TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TEMP TABLE seen (recipe_id TEXT PRIMARY KEY)")
+
+    def lookup(self, recipe: Dict[str, Any]) -> Tuple[str, Optional[List[Dict[str, str]]]]:
+        """Return the recipe's content hash and its cached issues, if unchanged"""
+        recipe_id = str(recipe['id'])
+        content_hash = recipe_content_hash(recipe, self.fingerprint)
+        self._conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (recipe_id,))
         
-        # Show forbidden ingredients first
-        forbidden_issues = [i for i in all_issues if i['code'] == 'FORBIDDEN_INGREDIENT']
-        if forbidden_issues:
-            print(f"\n🚫 FORBIDDEN INGREDIENTS ({len(forbidden_issues)} recipes)")
-            print("   Low-GI violations - using high-glycemic items:")
-            for i, issue in enumerate(forbidden_issues[:15], 1):
-                print(f"\n{i}. {issue['title']} ({issue['category']})")
-                print(f"   Issue: {issue['evidence']}")
-                print(f"   Fix: {issue['fix']}")
-            if len(forbidden_issues) > 15:
-                print(f"\n... and {len(forbidden_issues) - 15} more forbidden ingredient issues")
-        
-        # Show ghost ingredients
-        ghost_issues = [i for i in all_issues if i['code'] == 'STEP_GHOST_ING']
-        if ghost_issues and len(ghost_issues) <= 10:
-            print(f"\n👻 GHOST INGREDIENTS ({len(ghost_issues)} recipes)")
-            for i, issue in enumerate(ghost_issues, 1):
-                print(f"{i}. {issue['title']}: {issue['evidence']}")
-    
-    # Save report
-    print(f"\n💾 Full CSV report saved to: {output_file}")
-    print("   Open in Excel/Sheets for easy triage and filtering")
-    
-    cursor.close()
-    conn.close()
+        row = self._conn.execute(
+            "SELECT issues FROM recipe_results WHERE recipe_id = ? AND content_hash = ?",
+            (recipe_id, content_hash)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return content_hash, None
+        self.hits += 1
+        return content_hash, json.loads(row[0])
+
+    def store(self, recipe: Dict[str, Any], content_hash: str, issues: List[Dict[str, str]]):
+        """Queue freshly computed issues for the cache"""
+        self._pending.append((str(recipe['id']), content_hash, json.dumps(issues, ensure_ascii=False)))
+        if len(self._pending) >= CACHE_WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        """Write re-checked results to the cache"""
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recipe_results VALUES (?, ?, ?)", self._pending
+            )
+            self._pending = []
+        self._conn.commit()
+
+    def purge_unseen(self) -> int:
+        """Delete cached results for recipes not seen in this run"""
+        cursor = self._conn.execute(
+            "DELETE FROM recipe_results WHERE recipe_id NOT IN (SELECT recipe_id FROM seen)"
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+# ============================================================================
+# BUDGETED AUDIT
+# ============================================================================
+
+COVERAGE_FILE = 'scripts/audit_reports/.recipe_audit_coverage.sqlite'
+
+# Tiers of a --budget run's check order; labels for the coverage report
+BUDGET_TIERS = {
+    'changed': 'new or edited',
+    'prior_p0': 'prior P0',
+    'rotation': 'rotation',
+}
+
+# Largest share of the check order after the new and edited recipes that
+# goes to prior P0s while rotation recipes remain. Unfixed P0s keep their
+# tier, so uncapped they would crowd out the rotation run after run.
+PRIOR_P0_SHARE = 0.25
+
+# The full catalog, plus the creation time that orders new recipes
+BUDGET_RECIPE_QUERY = f"""
+    SELECT {', '.join(RECIPE_COLUMNS)}, created_at
+    FROM meals
+"""
+
+class AuditCoverage:
+    """Persistent record of which recipes each budgeted run reached.
+
+    `prioritise()` puts the catalog in check order: new recipes (added since
+    the first budgeted run) and edited ones (content unlike their last
+    check), newest first; then recipes whose last check found a P0,
+    interleaved with the rest so they take at most PRIOR_P0_SHARE of the
+    order; the rest go longest unchecked first and, among those, categories
+    with the highest issue rate first. The first run registers the whole catalog as
+    unchecked (run 0). Recipes a run does not reach keep their older run
+    number, so they lead the next run and coverage rotates through the
+    whole catalog.
+    """
+
+    def __init__(self, path: str = COVERAGE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS recipe_coverage (
+                recipe_id TEXT PRIMARY KEY,
+                content_hash TEXT,
+                category TEXT,
+                p0 INTEGER NOT NULL DEFAULT 0,
+                issues INTEGER NOT NULL DEFAULT 0,
+                checked_run INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.run = self._conn.execute("SELECT COALESCE(MAX(checked_run), 0) + 1 FROM recipe_coverage").fetchone()[0]
+        self.planned = {tier: 0 for tier in BUDGET_TIERS}
+        self.reached = {tier: 0 for tier in BUDGET_TIERS}
+        self.never_checked = 0
+        self.checked_ids: List[str] = []
+        self._plan: Dict[str, Tuple[str, str, bool]] = {}
+        self._pending: List[Tuple[str, str, Any, int, int, int]] = []
+
+    def prioritise(self, recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The recipes in check order; forgets recipes no longer in the catalog"""
+        known = {
+            row[0]: row[1:] for row in self._conn.execute(
+                "SELECT recipe_id, content_hash, category, p0, issues, checked_run FROM recipe_coverage"
+            )
+        }
+        current = {str(recipe['id']) for recipe in recipes}
+        deleted = [(recipe_id,) for recipe_id in known if recipe_id not in current]
+        if deleted:
+            self._conn.executemany("DELETE FROM recipe_coverage WHERE recipe_id = ?", deleted)
+        first_run = not known
+        if first_run:
+            self._conn.executemany("INSERT INTO recipe_coverage (recipe_id) VALUES (?)",
+                                   [(recipe_id,) for recipe_id in current])
+            known = {recipe_id: (None, None, 0, 0, 0) for recipe_id in current}
+        self._conn.commit()
+
+        # Share of each category's last-checked recipes that had any issue
+        category_totals: Dict[Any, List[int]] = {}
+        for recipe_id, (_, category, _, issues, checked_run) in known.items():
+            if checked_run and recipe_id in current:
+                totals = category_totals.setdefault(category, [0, 0])
+                totals[0] += issues > 0
+                totals[1] += 1
+        issue_rate = {category: flagged / total for category, (flagged, total) in category_totals.items()}
+
+        tiers: Dict[str, List[Dict[str, Any]]] = {tier: [] for tier in BUDGET_TIERS}
+        for recipe in recipes:
+            recipe_id = str(recipe['id'])
+            # Content only: a rule change re-checks everything but edits nothing
+            content_hash = recipe_content_hash(recipe, '')
+            row = known.get(recipe_id)
+            unchecked = row is None or not row[4]
+            if row is None or (not unchecked and row[0] != content_hash):
+                tier = 'changed'
+            elif row[2]:
+                tier = 'prior_p0'
+            else:
+                tier = 'rotation'
+            tiers[tier].append(recipe)
+            self._plan[recipe_id] = (content_hash, tier, unchecked)
+            self.planned[tier] += 1
+            self.never_checked += unchecked
+
+        def last_run(recipe: Dict[str, Any]) -> int:
+            return known[str(recipe['id'])][4]
+
+        tiers['changed'].sort(key=lambda recipe: str(recipe['id']))
+        tiers['changed'].sort(key=lambda recipe: str(recipe.get('created_at') or ''), reverse=True)
+        tiers['prior_p0'].sort(key=lambda recipe: (last_run(recipe), -known[str(recipe['id'])][2], str(recipe['id'])))
+        tiers['rotation'].sort(key=lambda recipe: (last_run(recipe), -issue_rate.get(recipe.get('category'), 0.0),
+                                                   str(recipe['id'])))
+        
+        order = tiers['changed']
+        prior_p0, rotation = deque(tiers['prior_p0']), deque(tiers['rotation'])
+        interleaved = 0
+        p0_taken = 0
+        while prior_p0 and rotation:
+            interleaved += 1
+            if p0_taken + 1 <= PRIOR_P0_SHARE * interleaved:
+                order.append(prior_p0.popleft())
+                p0_taken += 1
+            else:
+                order.append(rotation.popleft())
+        order.extend(prior_p0)
+        order.extend(rotation)
+        return order
+
+    def record(self, recipe: Dict[str, Any], issues: List[Dict[str, Any]]):
+        """Note that this run reached the recipe, and what its check found"""
+        recipe_id = str(recipe['id'])
+        content_hash, tier, unseen = self._plan[recipe_id]
+        self.reached[tier] += 1
+        self.never_checked -= unseen
+        self.checked_ids.append(recipe_id)
+        p0 = sum(1 for issue in issues if issue['severity'] == 'P0')
+        self._pending.append((recipe_id, content_hash, recipe.get('category'), p0, len(issues), self.run))
+        if len(self._pending) >= CACHE_WRITE_BATCH:
+            self.flush()
+
+    @property
+    def complete(self) -> bool:
+        return len(self.checked_ids) == len(self._plan)
+
+    def report(self, budget_seconds: float, elapsed_seconds: float) -> Dict[str, Any]:
+        """Coverage of this run, for the console and the metrics file"""
+        total = len(self._plan)
+        checked = len(self.checked_ids)
+        return {
+            'run': self.run,
+            'budget_s': budget_seconds,
+            'elapsed_s': round(elapsed_seconds, 3),
+            'recipes': total,
+            'checked': checked,
+            'coverage': round(checked / total, 4) if total else 1.0,
+            'carried_over': total - checked,
+            'never_checked': self.never_checked,
+            'tiers': {
+                tier: {'planned': self.planned[tier], 'checked': self.reached[tier]}
+                for tier in BUDGET_TIERS
+            },
+        }
+
+    def flush(self):
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recipe_coverage VALUES (?, ?, ?, ?, ?, ?)", self._pending
+            )
+            self._pending = []
+        self._conn.commit()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+# ============================================================================
+# METRICS & PROFILING
+# ============================================================================
+
+METRICS_FILE = 'recipe_consistency_metrics.json'
+PROMETHEUS_FILE = 'recipe_consistency_metrics.prom'
+PROFILE_FILE = 'recipe_consistency_profile.prof'
+
+# Latency histogram bucket upper bounds: 1µs to 10s, ten per decade
+LATENCY_BUCKETS = tuple(10 ** (exponent / 10) for exponent in range(-60, 11))
+
+# Slowest recipes kept for the metrics report
+DEFAULT_SLOWEST = 10
+
+class LatencyHistogram:
+    """Fixed log-bucket histogram; bounded memory and mergeable across processes"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (within ~26%)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                bound = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+class StageStats:
+    """Calls, issues emitted and latency for one instrumented stage"""
+
+    __slots__ = ('calls', 'issues', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.issues = 0
+        self.latency = LatencyHistogram()
+
+class CheckMetrics:
+    """Run-wide instrumentation of check_recipe and each check function"""
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.stages: Dict[str, StageStats] = {}
+        self.slowest = SmallestN(slowest)
+        self.recipes = 0
+        self.cached = 0
+        self.tokens = {'hits': 0, 'misses': 0, 'stemmed': 0, 'corrected': 0}
+        self.coverage: Optional[Dict[str, Any]] = None
+
+    def observe(self, stage: str, seconds: float, issues: int):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.calls += 1
+        stats.issues += issues
+        stats.latency.observe(seconds)
+
+    def observe_recipe(self, recipe_id: Any, seconds: float, issues: int):
+        self.observe('check_recipe', seconds, issues)
+        self.slowest.add(-seconds, (str(recipe_id), seconds, issues))
+
+    def observe_tokens(self, before: Dict[str, int], after: Dict[str, int]):
+        """Record the TokenResolver activity between two `stats()` snapshots"""
+        for key, value in after.items():
+            self.tokens[key] += value - before[key]
+
+    def token_hit_rate(self) -> float:
+        lookups = self.tokens['hits'] + self.tokens['misses']
+        return self.tokens['hits'] / lookups if lookups else 0.0
+
+    def merge(self, other: 'CheckMetrics'):
+        """Fold in metrics recorded by a worker process"""
+        for stage, theirs in other.stages.items():
+            ours = self.stages.get(stage)
+            if ours is None:
+                ours = self.stages[stage] = StageStats()
+            ours.calls += theirs.calls
+            ours.issues += theirs.issues
+            ours.latency.merge(theirs.latency)
+        for seconds_key, item in other.slowest._items:
+            self.slowest.add(seconds_key, item)
+        for key, value in other.tokens.items():
+            self.tokens[key] += value
+
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        result = {
+            'generated_at': datetime.now().isoformat(),
+            'wall_seconds': round(wall_seconds, 6),
+            'recipes': self.recipes,
+            'cached_recipes': self.cached,
+            'stages': {
+                stage: {
+                    'calls': stats.calls,
+                    'issues': stats.issues,
+                    'total_s': round(stats.latency.total, 6),
+                    'mean_s': round(stats.latency.total / stats.calls, 9) if stats.calls else 0.0,
+                    'p50_s': round(stats.latency.quantile(0.50), 9),
+                    'p95_s': round(stats.latency.quantile(0.95), 9),
+                    'p99_s': round(stats.latency.quantile(0.99), 9),
+                    'max_s': round(stats.latency.max, 9),
+                }
+                for stage, stats in self.stages.items()
+            },
+            'token_resolution': {
+                **self.tokens,
+                'hit_rate': round(self.token_hit_rate(), 4),
+                'distance': TOKEN_RESOLVER.distance,
+                'cache_size': TOKEN_RESOLVER.cache_size,
+            },
+            'slowest_recipes': [
+                {'recipe_id': recipe_id, 'seconds': round(seconds, 6), 'issues': issues}
+                for recipe_id, seconds, issues in self.slowest.items()
+            ],
+        }
+        if self.coverage:
+            result['budget_coverage'] = self.coverage
+        return result
+
+    def to_prometheus(self, wall_seconds: float) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP glycoguide_recipe_audit_recipes_total Recipes in the audit run',
+            '# TYPE glycoguide_recipe_audit_recipes_total counter',
+            f'glycoguide_recipe_audit_recipes_total {self.recipes}',
+            '# HELP glycoguide_recipe_audit_cached_recipes_total Recipes answered from the incremental cache',
+            '# TYPE glycoguide_recipe_audit_cached_recipes_total counter',
+            f'glycoguide_recipe_audit_cached_recipes_total {self.cached}',
+            '# HELP glycoguide_recipe_audit_wall_seconds Wall time of the audit run',
+            '# TYPE glycoguide_recipe_audit_wall_seconds gauge',
+            f'glycoguide_recipe_audit_wall_seconds {wall_seconds:.6f}',
+        ]
+        if self.coverage:
+            lines += [
+                '# HELP glycoguide_recipe_audit_coverage_ratio Share of the catalog a budgeted run checked',
+                '# TYPE glycoguide_recipe_audit_coverage_ratio gauge',
+                f'glycoguide_recipe_audit_coverage_ratio {self.coverage["coverage"]}',
+                '# HELP glycoguide_recipe_audit_carried_over Recipes a budgeted run left for the next one',
+                '# TYPE glycoguide_recipe_audit_carried_over gauge',
+                f'glycoguide_recipe_audit_carried_over {self.coverage["carried_over"]}',
+            ]
+        lines += [
+            '# HELP glycoguide_recipe_token_lookups_total Word resolutions answered by (hit) or added to (miss) the memo',
+            '# TYPE glycoguide_recipe_token_lookups_total counter',
+            f'glycoguide_recipe_token_lookups_total{{result="hit"}} {self.tokens["hits"]}',
+            f'glycoguide_recipe_token_lookups_total{{result="miss"}} {self.tokens["misses"]}',
+            '# HELP glycoguide_recipe_token_rewrites_total Computed word resolutions that stemmed or corrected the word',
+            '# TYPE glycoguide_recipe_token_rewrites_total counter',
+            f'glycoguide_recipe_token_rewrites_total{{kind="stemmed"}} {self.tokens["stemmed"]}',
+            f'glycoguide_recipe_token_rewrites_total{{kind="corrected"}} {self.tokens["corrected"]}',
+            '# HELP glycoguide_recipe_check_calls_total Invocations per check stage',
+            '# TYPE glycoguide_recipe_check_calls_total counter',
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(f'glycoguide_recipe_check_calls_total{{check="{stage}"}} {stats.calls}')
+        lines += [
+            '# HELP glycoguide_recipe_check_issues_total Issues emitted per check stage',
+            '# TYPE glycoguide_recipe_check_issues_total counter',
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(f'glycoguide_recipe_check_issues_total{{check="{stage}"}} {stats.issues}')
+        lines += [
+            '# HELP glycoguide_recipe_check_duration_seconds Wall time per check stage call',
+            '# TYPE glycoguide_recipe_check_duration_seconds histogram',
+        ]
+        for stage, stats in self.stages.items():
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, stats.latency.counts):
+                cumulative += bucket_count
+                lines.append(f'glycoguide_recipe_check_duration_seconds_bucket{{check="{stage}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'glycoguide_recipe_check_duration_seconds_bucket{{check="{stage}",le="+Inf"}} {stats.latency.count}')
+            lines.append(f'glycoguide_recipe_check_duration_seconds_sum{{check="{stage}"}} {stats.latency.total:.9f}')
+            lines.append(f'glycoguide_recipe_check_duration_seconds_count{{check="{stage}"}} {stats.latency.count}')
+        return '\n'.join(lines) + '\n'
+
+def write_metrics(metrics: CheckMetrics, directory: str, wall_seconds: float) -> Tuple[str, str]:
+    """Write the JSON and Prometheus metrics files; returns their paths"""
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, METRICS_FILE)
+    prom_path = os.path.join(directory, PROMETHEUS_FILE)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(metrics.to_dict(wall_seconds), f, indent=2)
+    with open(prom_path, 'w', encoding='utf-8') as f:
+        f.write(metrics.to_prometheus(wall_seconds))
+    return json_path, prom_path
+
+# ============================================================================
+# CHECK PIPELINE
+# ============================================================================
+
+# Recipes per task sent to a worker process
+DEFAULT_CHUNK_SIZE = 200
+
+# Largest chunk in a --budget run: the chunks in flight when time runs out
+# are dropped, so they are kept small
+BUDGET_CHUNK_SIZE = 25
+
+def _init_worker(fuzzy_distance: int, token_cache_size: int):
+    """Pool initializer: leave Ctrl-C handling to the parent process.
+
+    The rule tables and automata are module globals, so each worker builds
+    them once at import (or inherits them on fork); tasks only carry recipes.
+    The word resolver gets the parent's settings and a memo of its own.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    TOKEN_RESOLVER.configure(fuzzy_distance, token_cache_size)
+
+def _check_chunk(recipes: List[Dict[str, Any]], instrument: bool = False
+                 ) -> Tuple[List[List[Dict[str, str]]], Optional[CheckMetrics]]:
+    """Worker task: bare issues for each recipe in the chunk, plus its metrics"""
+    metrics = CheckMetrics() if instrument else None
+    return [run_checks(recipe, metrics) for recipe in recipes], metrics
+
+def _chunked(items: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def check_recipes(recipes: Iterator[Dict[str, Any]], cache: Optional[ResultCache] = None,
+                  workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  metrics: Optional[CheckMetrics] = None, deadline: Optional[float] = None
+                  ) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Yield (recipe, issues) for every recipe, in input order.
+
+    Cached results are resolved in this process; the remaining recipes are
+    checked here (`workers` <= 1) or in chunks on a process pool. At most
+    two chunks per worker are in flight, so memory stays bounded.
+    
+    With a `deadline` (a time.monotonic() value), no recipe is started and
+    no chunk sent once it has passed; every chunk finished by then is still
+    yielded, and the rest of the input is left unchecked.
+    """
+    def expired() -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+    
+    if workers <= 1:
+        for recipe in recipes:
+            if expired():
+                return
+            content_hash, issues = cache.lookup(recipe) if cache else (None, None)
+            if issues is None:
+                issues = run_checks(recipe, metrics)
+                if cache:
+                    cache.store(recipe, content_hash, issues)
+            elif metrics:
+                metrics.cached += 1
+            if metrics:
+                metrics.recipes += 1
+            yield recipe, annotate_issues(recipe, issues)
+        return
+    
+    def finish(prepared, result):
+        results, chunk_metrics = result.get()
+        if metrics:
+            metrics.merge(chunk_metrics)
+        fresh = iter(results)
+        for recipe, content_hash, issues in prepared:
+            if issues is None:
+                issues = next(fresh)
+                if cache:
+                    cache.store(recipe, content_hash, issues)
+            elif metrics:
+                metrics.cached += 1
+            if metrics:
+                metrics.recipes += 1
+            yield recipe, annotate_issues(recipe, issues)
+    
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(TOKEN_RESOLVER.distance, TOKEN_RESOLVER.cache_size)) as pool:
+        pending = deque()
+        
+        def finished_in_time() -> bool:
+            """Wait for the oldest chunk, at most until the deadline if there is one"""
+            result = pending[0][1]
+            if deadline is None:
+                result.wait()
+            else:
+                result.wait(max(deadline - time.monotonic(), 0))
+            return result.ready()
+        
+        for chunk in _chunked(recipes, chunk_size):
+            if expired():
+                break
+            prepared = []
+            for recipe in chunk:
+                content_hash, issues = cache.lookup(recipe) if cache else (None, None)
+                prepared.append((recipe, content_hash, issues))
+            todo = [recipe for recipe, _, issues in prepared if issues is None]
+            pending.append((prepared, pool.apply_async(_check_chunk, (todo, metrics is not None))))
+            if len(pending) >= 2 * workers:
+                if not finished_in_time():
+                    return
+                yield from finish(*pending.popleft())
+        while pending and finished_in_time():
+            yield from finish(*pending.popleft())
+
+# ============================================================================
+# IMAGE INDEX
+# ============================================================================
+
+IMAGE_HASH_CACHE_FILE = 'scripts/audit_reports/.recipe_image_hashes.sqlite'
+
+# Directories an image_url path is looked up under, in order: /attached_assets
+# is served from the repo root (server/index.ts), other static files from client/public
+DEFAULT_IMAGE_ROOTS = ['.', 'client/public']
+
+# 64-bit difference hash; images within this many differing bits are near-duplicates
+DHASH_SIZE = 8
+DEFAULT_IMAGE_DISTANCE = 6
+
+# Other recipes named in a duplicate issue's evidence
+DUPLICATE_EXAMPLES = 3
+
+def resolve_image_path(image_url: str, roots: List[str]) -> Optional[str]:
+    """Local file behind an image URL, if one exists under any root"""
+    relative = urlparse(image_url).path.lstrip('/')
+    if not relative:
+        return None
+    for root in roots:
+        candidate = os.path.join(root, relative)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def difference_hash(path: str) -> int:
+    """dHash: 1 bit per horizontally adjacent pixel pair of a 9x8 grayscale thumbnail"""
+    with Image.open(path) as image:
+        pixels = image.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class BKTree:
+    """Burkhard-Keller tree over hashes under Hamming distance.
+
+    A radius query only descends into children whose edge distance is within
+    the radius of the query's distance to the node (triangle inequality), so
+    it visits a small part of the tree instead of every stored hash.
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        # Node: [hash, items with exactly this hash, {distance: child}]
+        self._root: Optional[List[Any]] = None
+
+    def add(self, value: int, item: Any):
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(node[0], value)
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, Any]]:
+        """(distance, item) for every stored item within `radius` of value"""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(node[0], value)
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+class ImageHashCache:
+    """Persistent image hashes keyed on image_url + image_version"""
+
+    def __init__(self, path: str = IMAGE_HASH_CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                image_url TEXT NOT NULL,
+                image_version INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (image_url, image_version)
+            )
+        """)
+
+    def get(self, image_url: str, image_version: int) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT hash FROM image_hashes WHERE image_url = ? AND image_version = ?",
+            (image_url, image_version)
+        ).fetchone()
+        return int(row[0], 16) if row else None
+
+    def put(self, image_url: str, image_version: int, value: int):
+        # Hex text: a 64-bit hash overflows SQLite's signed integers
+        self._conn.execute("INSERT OR REPLACE INTO image_hashes VALUES (?, ?, ?)",
+                           (image_url, image_version, f'{value:016x}'))
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+class ImageDuplicateIndex:
+    """Corpus-level detection of recipe images reused across recipes.
+
+    Recipes are added as they are checked; each new image hash is looked up
+    in a BK-tree of the hashes seen so far and then inserted, so the work per
+    recipe stays logarithmic-ish rather than a pass over every other image.
+    Hashes are cached by image_url + image_version, so only new or replaced
+    images are decoded. Recipes sharing an image_url are duplicates even
+    when the file cannot be read (or Pillow is not installed).
+    """
+
+    def __init__(self, roots: Optional[List[str]] = None, distance: int = DEFAULT_IMAGE_DISTANCE,
+                 cache: Optional[ImageHashCache] = None):
+        self.roots = roots or DEFAULT_IMAGE_ROOTS
+        self.distance = distance
+        self.cache = cache
+        self.hashed = 0
+        self.cached = 0
+        self.unresolved = 0
+        self._recipes: List[Tuple[Any, str, str]] = []
+        self._parent: List[int] = []
+        # Closest match seen per recipe (0 = identical file or hash)
+        self._closest: List[Optional[int]] = []
+        self._by_url: Dict[str, int] = {}
+        self._tree = BKTree()
+
+    def _find(self, index: int) -> int:
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def _link(self, a: int, b: int, distance: int):
+        self._parent[self._find(a)] = self._find(b)
+        for index in (a, b):
+            if self._closest[index] is None or distance < self._closest[index]:
+                self._closest[index] = distance
+
+    def _image_hash(self, image_url: str, image_version: int) -> Optional[int]:
+        if self.cache:
+            value = self.cache.get(image_url, image_version)
+            if value is not None:
+                self.cached += 1
+                return value
+        if Image is None:
+            return None
+        path = resolve_image_path(image_url, self.roots)
+        if path is None:
+            self.unresolved += 1
+            return None
+        try:
+            value = difference_hash(path)
+        except (OSError, ValueError):
+            self.unresolved += 1
+            return None
+        self.hashed += 1
+        if self.cache:
+            self.cache.put(image_url, image_version, value)
+        return value
+
+    def add(self, recipe: Dict[str, Any]):
+        image_url = recipe.get('image_url')
+        if not image_url:
+            return
+        index = len(self._recipes)
+        self._recipes.append((recipe['id'], recipe['name'], recipe.get('category', '')))
+        self._parent.append(index)
+        self._closest.append(None)
+        
+        # Same file: no need to hash it again
+        first = self._by_url.setdefault(image_url, index)
+        if first != index:
+            self._link(index, first, 0)
+            return
+        
+        value = self._image_hash(image_url, recipe.get('image_version') or 1)
+        if value is None:
+            return
+        for distance, other in self._tree.search(value, self.distance):
+            self._link(index, other, distance)
+        self._tree.add(value, index)
+
+    def issues(self) -> List[Dict[str, Any]]:
+        """One issue per recipe whose image is shared with, or nearly identical to, another recipe's"""
+        clusters: Dict[int, List[int]] = {}
+        for index in range(len(self._recipes)):
+            if self._closest[index] is not None:
+                clusters.setdefault(self._find(index), []).append(index)
+        
+        issues = []
+        for members in clusters.values():
+            for index in members:
+                recipe_id, title, category = self._recipes[index]
+                others = [self._recipes[other][1] for other in members if other != index]
+                named = ', '.join(others[:DUPLICATE_EXAMPLES])
+                if len(others) > DUPLICATE_EXAMPLES:
+                    named += f" and {len(others) - DUPLICATE_EXAMPLES} more"
+                if self._closest[index] == 0:
+                    issue = {
+                        'code': 'IMG_DUPLICATE',
+                        'severity': 'P1',
+                        'where': 'image',
+                        'evidence': f"Same image as {len(others)} other recipe(s): {named}",
+                        'fix': 'Give this recipe its own photo',
+                    }
+                else:
+                    issue = {
+                        'code': 'IMG_NEAR_DUPLICATE',
+                        'severity': 'P2',
+                        'where': 'image',
+                        'evidence': f"Image nearly identical to {len(others)} other recipe(s): {named}",
+                        'fix': 'Verify the image shows this recipe and not a lookalike',
+                    }
+                issue.update(recipe_id=recipe_id, title=title, category=category)
+                issues.append(issue)
+        issues.sort(key=lambda issue: issue['title'] or '')
+        return issues
+
+# ============================================================================
+# NEAR-DUPLICATE RECIPES
+# ============================================================================
+
+SIGNATURE_CACHE_FILE = 'scripts/audit_reports/.recipe_signatures.sqlite'
+
+# 128 MinHash values split into 16 LSH bands of 8 rows: pairs at Jaccard
+# similarity s become candidates with probability 1 - (1 - s^8)^16, about
+# 0.96 at s = 0.8 and 0.01 at s = 0.4
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+MINHASH_SEED = 20250915
+
+# Instruction text is compared as overlapping runs of this many words
+SHINGLE_SIZE = 3
+
+# Exact Jaccard similarity of two recipes' features that makes them near-duplicates
+DEFAULT_NEAR_DUP_THRESHOLD = 0.8
+
+# Buckets shared by more recipes than this are boilerplate, not duplicates
+MAX_LSH_BUCKET = 200
+
+SHINGLE_WORD_PATTERN = re.compile(r'[a-z]+')
+
+def recipe_features(recipe: Dict[str, Any]) -> Set[str]:
+    """Ingredient names plus word shingles of the instructions"""
+    features = {f'ing:{name}' for name in extract_ingredient_names(recipe.get('ingredients') or [])}
+    words = SHINGLE_WORD_PATTERN.findall(normalize_text(recipe.get('instructions') or ''))
+    for start in range(max(0, len(words) - SHINGLE_SIZE + 1)):
+        features.add('step:' + ' '.join(words[start:start + SHINGLE_SIZE]))
+    return features
+
+def feature_hashes(features: Set[str]) -> 'np.ndarray':
+    """Sorted 64-bit hashes of a feature set"""
+    return np.array(sorted({
+        int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        for feature in features
+    }), dtype=np.uint64)
+
+class MinHasher:
+    """MinHash over 64-bit feature hashes with multiply-shift hash functions"""
+
+    def __init__(self, permutations: int = MINHASH_PERMUTATIONS, seed: int = MINHASH_SEED):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers; products wrap mod 2^64, and the top 32 bits are the hash
+        self.a = rng.integers(1, 2 ** 63, size=permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=permutations, dtype=np.uint64)
+
+    def signature(self, hashes: 'np.ndarray') -> 'np.ndarray':
+        products = self.a[:, None] * hashes[None, :] + self.b[:, None]
+        return (products >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+class SignatureCache:
+    """Persistent MinHash signatures and feature hashes, keyed on recipe id + content hash"""
+
+    def __init__(self, path: str = SIGNATURE_CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS recipe_signatures (
+                recipe_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                features BLOB NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TEMP TABLE seen_signatures (recipe_id TEXT PRIMARY KEY)")
+
+    def lookup(self, recipe_id: str, content_hash: str) -> Optional['np.ndarray']:
+        self._conn.execute("INSERT OR IGNORE INTO seen_signatures VALUES (?)", (recipe_id,))
+        row = self._conn.execute(
+            "SELECT signature FROM recipe_signatures WHERE recipe_id = ? AND content_hash = ?",
+            (recipe_id, content_hash)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return np.frombuffer(row[0], dtype=np.uint32)
+
+    def store(self, recipe_id: str, content_hash: str, signature: 'np.ndarray', hashes: 'np.ndarray'):
+        self._conn.execute("INSERT OR REPLACE INTO recipe_signatures VALUES (?, ?, ?, ?)",
+                           (recipe_id, content_hash, signature.tobytes(), hashes.tobytes()))
+
+    def features(self, recipe_id: str) -> 'np.ndarray':
+        row = self._conn.execute(
+            "SELECT features FROM recipe_signatures WHERE recipe_id = ?", (recipe_id,)
+        ).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint64)
+
+    def purge_unseen(self) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM recipe_signatures WHERE recipe_id NOT IN (SELECT recipe_id FROM seen_signatures)"
+        )
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+class NearDuplicateIndex:
+    """Cross-recipe near-duplicate detection with MinHash + LSH banding.
+
+    Each recipe's features (ingredient names and instruction shingles) get a
+    MinHash signature, reused from the cache when the recipe is unchanged.
+    Recipes sharing any band of their signature are candidates; only those
+    pairs are compared exactly, on the stored feature hashes.
+    """
+
+    def __init__(self, cache: SignatureCache, threshold: float = DEFAULT_NEAR_DUP_THRESHOLD):
+        self.cache = cache
+        self.threshold = threshold
+        self.hasher = MinHasher()
+        self.fingerprint = ruleset_fingerprint()
+        self.candidates = 0
+        self._recipes: List[Tuple[str, str, str]] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def _content_hash(self, recipe: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            [self.fingerprint, MINHASH_PERMUTATIONS, MINHASH_SEED, SHINGLE_SIZE,
+             recipe.get('ingredients'), recipe.get('instructions')],
+            ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def add(self, recipe: Dict[str, Any]):
+        recipe_id = str(recipe['id'])
+        content_hash = self._content_hash(recipe)
+        signature = self.cache.lookup(recipe_id, content_hash)
+        if signature is None:
+            hashes = feature_hashes(recipe_features(recipe))
+            if not len(hashes):
+                return
+            signature = self.hasher.signature(hashes)
+            self.cache.store(recipe_id, content_hash, signature, hashes)
+        
+        index = len(self._recipes)
+        self._recipes.append((recipe_id, recipe['name'], recipe.get('category', '')))
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+            self._buckets.setdefault(key, []).append(index)
+
+    def issues(self) -> List[Dict[str, Any]]:
+        """One RECIPE_NEAR_DUP issue per recipe in a cluster of near-duplicates"""
+        pairs = set()
+        for members in self._buckets.values():
+            if 1 < len(members) <= MAX_LSH_BUCKET:
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pairs.add((a, b))
+        self.candidates = len(pairs)
+        
+        features: Dict[int, 'np.ndarray'] = {}
+        def load(index: int) -> 'np.ndarray':
+            if index not in features:
+                features[index] = self.cache.features(self._recipes[index][0])
+            return features[index]
+        
+        parent = list(range(len(self._recipes)))
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+        
+        best: Dict[int, Tuple[float, int]] = {}
+        for a, b in sorted(pairs):
+            features_a, features_b = load(a), load(b)
+            shared = len(np.intersect1d(features_a, features_b, assume_unique=True))
+            similarity = shared / (len(features_a) + len(features_b) - shared)
+            if similarity < self.threshold:
+                continue
+            parent[find(a)] = find(b)
+            for index, other in ((a, b), (b, a)):
+                if index not in best or similarity > best[index][0]:
+                    best[index] = (similarity, other)
+        
+        clusters: Dict[int, List[int]] = {}
+        for index in sorted(best):
+            clusters.setdefault(find(index), []).append(index)
+        
+        issues = []
+        for members in clusters.values():
+            for index in members:
+                recipe_id, title, category = self._recipes[index]
+                similarity, closest = best[index]
+                others = len(members) - 1
+                issues.append({
+                    'code': 'RECIPE_NEAR_DUP',
+                    'severity': 'P1',
+                    'where': 'recipe',
+                    'evidence': f"{similarity:.0%} similar to '{self._recipes[closest][1]}'"
+                                + (f" (cluster of {others + 1} recipes)" if others > 1 else ''),
+                    'fix': 'Merge or remove the duplicate recipe',
+                    'recipe_id': recipe_id,
+                    'title': title,
+                    'category': category,
+                })
+        issues.sort(key=lambda issue: issue['title'] or '')
+        return issues
+
+# ============================================================================
+# NUTRITION CONSISTENCY
+# ============================================================================
+
+# Numeric meals columns read by the nutrition check, and their units
+NUTRITION_COLUMNS = ('calories', 'carbohydrates', 'protein', 'fat', 'fiber', 'glycemic_value')
+NUTRITION_UNITS = {'calories': ' kcal', 'carbohydrates': 'g', 'protein': 'g', 'fat': 'g', 'fiber': 'g',
+                   'glycemic_value': ''}
+
+# Atwater factors: kcal per gram of carbohydrate, protein and fat
+KCAL_PER_GRAM = {'carbohydrates': 4.0, 'protein': 4.0, 'fat': 9.0}
+
+# Stated calories may differ from the macro estimate by this fraction
+# (rounding, fibre, sugar alcohols), and always by this many kcal
+CALORIE_TOLERANCE = 0.25
+CALORIE_SLACK_KCAL = 30
+
+# glycemic_index labels and the highest glycemic_value of each band, as on
+# the client (low ≤55, medium 56-69, high ≥70)
+GLYCEMIC_LEVELS = ('low', 'medium', 'high')
+GLYCEMIC_BAND_LIMITS = (55, 69)
+
+# Robust z-score (median/MAD) beyond which a value is unusual for its
+# category, and the smallest category the statistics are trusted for
+OUTLIER_SCORE = 3.5
+OUTLIER_MIN_CATEGORY = 8
+
+def nutrition_value(value: Any) -> float:
+    """A numeric meals column as a float; NULL, '' and text that is not a number are NaN"""
+    if value is None or value == '':
+        return float('nan')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+class NutritionCheck:
+    """Catalog-wide consistency of the numeric meals columns.
+
+    Recipes only contribute a row of numbers as they stream past; `issues()`
+    checks the whole catalog at once with NumPy array operations: calories
+    against the 4/4/9 macro estimate, the glycemic_index label against
+    glycemic_value, and per-category outliers.
+    """
+
+    def __init__(self):
+        self._recipes: List[Tuple[Any, str, str, str]] = []
+        self._values: List[List[float]] = []
+
+    def add(self, recipe: Dict[str, Any]):
+        self._recipes.append((recipe['id'], recipe['name'], recipe.get('category') or '',
+                              (recipe.get('glycemic_index') or '').lower()))
+        self._values.append([nutrition_value(recipe.get(column)) for column in NUTRITION_COLUMNS])
+
+    def _issue(self, index: int, code: str, severity: str, where: str, evidence: str, fix: str) -> Dict[str, Any]:
+        recipe_id, title, category, _ = self._recipes[index]
+        return {
+            'code': code,
+            'severity': severity,
+            'where': where,
+            'evidence': evidence,
+            'fix': fix,
+            'recipe_id': recipe_id,
+            'title': title,
+            'category': category,
+        }
+
+    def issues(self) -> List[Dict[str, Any]]:
+        """NUTR_KCAL_MISMATCH, NUTR_GI_MISMATCH and NUTR_OUTLIER issues for the catalog"""
+        if not self._recipes:
+            return []
+        values = np.array(self._values, dtype=float)
+        column = {name: values[:, i] for i, name in enumerate(NUTRITION_COLUMNS)}
+        issues = []
+        
+        # Calories against the macro estimate; rows with a missing value compare False
+        estimate = sum(column[name] * factor for name, factor in KCAL_PER_GRAM.items())
+        with np.errstate(invalid='ignore'):
+            mismatched = np.abs(column['calories'] - estimate) > np.maximum(CALORIE_TOLERANCE * estimate,
+                                                                            CALORIE_SLACK_KCAL)
+        for i in np.flatnonzero(mismatched).tolist():
+            carbohydrates, protein, fat = (column[name][i] for name in KCAL_PER_GRAM)
+            issues.append(self._issue(
+                i, 'NUTR_KCAL_MISMATCH', 'P1', 'nutrition',
+                f"Calories {column['calories'][i]:g} kcal but macros give {estimate[i]:.0f} kcal "
+                f"(4×{carbohydrates:g}g carbs + 4×{protein:g}g protein + 9×{fat:g}g fat)",
+                'Correct calories or the macro grams'
+            ))
+        
+        # glycemic_index label against the band of glycemic_value
+        labels = np.array([GLYCEMIC_LEVELS.index(recipe[3]) if recipe[3] in GLYCEMIC_LEVELS else -1
+                           for recipe in self._recipes])
+        glycemic_value = column['glycemic_value']
+        bands = np.searchsorted(GLYCEMIC_BAND_LIMITS, glycemic_value)
+        mislabelled = (labels >= 0) & ~np.isnan(glycemic_value) & (labels != bands)
+        for i in np.flatnonzero(mislabelled).tolist():
+            label, band = GLYCEMIC_LEVELS[labels[i]], GLYCEMIC_LEVELS[bands[i]]
+            # Labelled lower than its value breaks the low-GI promise
+            issues.append(self._issue(
+                i, 'NUTR_GI_MISMATCH', 'P0' if labels[i] < bands[i] else 'P1', 'glycemic_index',
+                f"glycemic_index is '{label}' but glycemic_value {glycemic_value[i]:g} is {band} GI",
+                f"Set glycemic_index to '{band}' or correct glycemic_value"
+            ))
+        
+        # Robust z-scores within each category; a zero MAD gives no score
+        categories, category_index = np.unique([recipe[2] for recipe in self._recipes], return_inverse=True)
+        outliers: Dict[int, List[str]] = {}
+        for group, category in enumerate(categories.tolist()):
+            rows = np.flatnonzero(category_index == group)
+            if len(rows) < OUTLIER_MIN_CATEGORY:
+                continue
+            sample = values[rows]
+            with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+                # All-NaN columns
+                warnings.simplefilter('ignore', RuntimeWarning)
+                median = np.nanmedian(sample, axis=0)
+                mad = np.nanmedian(np.abs(sample - median), axis=0)
+                score = 0.6745 * (sample - median) / np.where(mad > 0, mad, np.nan)
+                unusual = np.abs(score) > OUTLIER_SCORE
+            for row, j in zip(*np.nonzero(unusual)):
+                name = NUTRITION_COLUMNS[j]
+                unit = NUTRITION_UNITS[name]
+                outliers.setdefault(int(rows[row]), []).append(
+                    f"{name} {sample[row, j]:g}{unit} (median {median[j]:g}{unit})"
+                )
+        for i, findings in sorted(outliers.items()):
+            issues.append(self._issue(
+                i, 'NUTR_OUTLIER', 'P2', 'nutrition',
+                f"Unusual for {self._recipes[i][2]}: {'; '.join(findings)}",
+                'Check the nutrition values against the recipe'
+            ))
+        
+        issues.sort(key=lambda issue: issue['title'] or '')
+        return issues
+
+# ============================================================================
+# KEYSET READER
+# ============================================================================
+
+KEYSET_FIRST_PAGE_QUERY = f"""
+    SELECT {', '.join(RECIPE_COLUMNS)}
+    FROM meals
+    ORDER BY id
+    LIMIT %s
+"""
+
+KEYSET_NEXT_PAGE_QUERY = f"""
+    SELECT {', '.join(RECIPE_COLUMNS)}
+    FROM meals
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_PREFETCH = 2
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+
+class PostgresPageSource:
+    """Keyset pages of meals over a single pooled, read-only connection.
+
+    Each page is its own short transaction with a statement timeout, so a
+    full audit never holds a long-running snapshot on the primary.
+    """
+
+    def __init__(self, database_url: str, statement_timeout_ms: int = DEFAULT_STATEMENT_TIMEOUT_MS):
+        self.statement_timeout_ms = statement_timeout_ms
+        self._pool = ThreadedConnectionPool(1, 1, database_url, cursor_factory=RealDictCursor)
+
+    def fetch_page(self, after: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` recipes with id greater than `after` (first page if None)"""
+        conn = self._pool.getconn()
+        try:
+            conn.set_session(readonly=True)
+            with conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", (self.statement_timeout_ms,))
+                    if after is None:
+                        cursor.execute(KEYSET_FIRST_PAGE_QUERY, (limit,))
+                    else:
+                        cursor.execute(KEYSET_NEXT_PAGE_QUERY, (after, limit))
+                    return [dict(row) for row in cursor.fetchall()]
+        finally:
+            self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.closeall()
+
+class RecordedPageSource:
+    """Stand-in for PostgresPageSource that pages through recorded meals rows.
+
+    Backs --keyset --replay, so a keyset run can be reproduced against a
+    JSONL or CSV dump without a database.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = sorted(rows, key=lambda row: str(row['id']))
+        self._ids = [str(row['id']) for row in self._rows]
+        self.pages_served = 0
+
+    @classmethod
+    def from_file(cls, path: str, fmt: Optional[str] = None) -> 'RecordedPageSource':
+        return cls(list(iter_recipe_file(path, fmt)))
+
+    def fetch_page(self, after: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        start = 0 if after is None else bisect_right(self._ids, str(after))
+        self.pages_served += 1
+        return [
+            {column: row.get(column) for column in RECIPE_COLUMNS}
+            for row in self._rows[start:start + limit]
+        ]
+
+    def close(self):
+        pass
+
+async def read_pages(source, page_size: int, pages: 'asyncio.Queue'):
+    """Producer: fetch keyset pages in a worker thread and queue them.
+
+    The queue is bounded, so at most `maxsize` pages are fetched ahead of
+    the check stage. Ends with None, or with the exception that stopped it.
+    """
+    after = None
+    try:
+        while True:
+            page = await asyncio.to_thread(source.fetch_page, after, page_size)
+            if page:
+                await pages.put(page)
+            if len(page) < page_size:
+                break
+            after = page[-1]['id']
+    except Exception as exc:
+        await pages.put(exc)
+        return
+    await pages.put(None)
+
+def iter_keyset_recipes(source, page_size: int = DEFAULT_PAGE_SIZE,
+                        prefetch: int = DEFAULT_PREFETCH) -> Iterator[Dict[str, Any]]:
+    """Yield recipes page by page while the next pages are fetched concurrently.
+
+    The asyncio producer runs on its own event loop thread; this generator is
+    the consumer feeding the (synchronous) check stage.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name='keyset-reader', daemon=True)
+    thread.start()
+    
+    async def start() -> Tuple[asyncio.Queue, asyncio.Task]:
+        pages = asyncio.Queue(maxsize=max(1, prefetch))
+        return pages, asyncio.create_task(read_pages(source, page_size, pages))
+    
+    async def stop(producer: asyncio.Task):
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        await loop.shutdown_default_executor()
+    
+    pages, producer = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    try:
+        while True:
+            page = asyncio.run_coroutine_threadsafe(pages.get(), loop).result()
+            if page is None:
+                break
+            if isinstance(page, Exception):
+                raise page
+            yield from page
+    finally:
+        asyncio.run_coroutine_threadsafe(stop(producer), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+# ============================================================================
+# FILE INPUT & EXPORT
+# ============================================================================
+
+# Full meals schema, as written by --export
+MEALS_EXPORT_COLUMNS = [
+    'id', 'name', 'description', 'category', 'glycemic_index', 'glycemic_value',
+    'carbohydrates', 'calories', 'protein', 'fat', 'fiber', 'image_url',
+    'image_locked', 'image_version', 'ingredients', 'instructions',
+    'prep_time_minutes', 'created_at',
+]
+
+INPUT_FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Dump format from an explicit choice or the file extension"""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in INPUT_FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; use .jsonl, .ndjson or .csv (or --input-format)")
+    return INPUT_FORMATS[extension]
+
+def iter_mapped_lines(path: str) -> Iterator[str]:
+    """Decoded lines of a memory-mapped file, one at a time"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b''):
+                yield line.decode('utf-8')
+
+def parse_pg_array(value: str) -> List[Optional[str]]:
+    """Parse a one-dimensional Postgres text[] literal such as {a,"b c",NULL}"""
+    items: List[Optional[str]] = []
+    inner = value.strip()[1:-1]
+    i = 0
+    while i < len(inner):
+        if inner[i] == '"':
+            i += 1
+            chars = []
+            while inner[i] != '"':
+                if inner[i] == '\\':
+                    i += 1
+                chars.append(inner[i])
+                i += 1
+            items.append(''.join(chars))
+            i += 1
+        else:
+            end = inner.find(',', i)
+            end = len(inner) if end == -1 else end
+            token = inner[i:end].strip()
+            items.append(None if token == 'NULL' else token)
+            i = end
+        # Skip the separating comma
+        i += 1
+    return items
+
+def parse_ingredients_field(value: Any) -> List[str]:
+    """Ingredients from a dump: a list, a JSON array or a Postgres array literal"""
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    if value.startswith('{'):
+        return parse_pg_array(value)
+    return [value]
+
+def iter_recipe_file(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield recipes from a JSONL or CSV dump of meals, parsing one record at a time"""
+    fmt = detect_format(path, fmt)
+    lines = iter_mapped_lines(path)
+    
+    if fmt == 'jsonl':
+        for line in lines:
+            if line.strip():
+                recipe = json.loads(line)
+                recipe['ingredients'] = parse_ingredients_field(recipe.get('ingredients'))
+                yield recipe
+        return
+    
+    # csv.reader stitches quoted multi-line fields back together
+    for recipe in csv.DictReader(lines):
+        recipe['ingredients'] = parse_ingredients_field(recipe.get('ingredients'))
+        yield recipe
+
+def export_meals(conn, path: str, fmt: Optional[str] = None) -> int:
+    """Bulk-dump meals to a JSONL or CSV file with COPY; returns the byte count"""
+    fmt = detect_format(path, fmt)
+    columns = ', '.join(
+        'array_to_json(ingredients) AS ingredients' if column == 'ingredients' else column
+        for column in MEALS_EXPORT_COLUMNS
+    )
+    if fmt == 'jsonl':
+        # CSV mode with control-character quote/delimiter writes the JSON text
+        # verbatim (text mode would escape its backslashes)
+        copy_sql = f"""
+            COPY (SELECT row_to_json(m) FROM (SELECT {columns} FROM meals ORDER BY id) m)
+            TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')
+        """
+    else:
+        copy_sql = f"COPY (SELECT {columns} FROM meals ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER)"
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with conn.cursor() as cursor, open(path, 'w', encoding='utf-8', newline='') as f:
+        cursor.copy_expert(copy_sql, f)
+    return os.path.getsize(path)
+
+# ============================================================================
+# REPORT OUTPUT
+# ============================================================================
+
+REPORT_FILE = 'scripts/audit_reports/recipe_consistency_report.csv'
+REPORT_FIELDNAMES = ['severity', 'recipe_id', 'title', 'category', 'issue_code', 'where', 'evidence', 'suggested_fix', 'updated_at']
+SEVERITY_ORDER = {'P0': 0, 'P1': 1, 'P2': 2}
+
+# Rows held in memory before a sorted run is spilled to disk
+DEFAULT_SORT_RUN_SIZE = 50000
+
+# Issues listed per type in the console summary
+FORBIDDEN_EXAMPLES = 15
+GHOST_EXAMPLES = 10
+
+def issue_to_row(issue: Dict[str, Any], updated_at: str) -> List[Any]:
+    """Flatten an issue into report column order, stamped with the run time"""
+    return [
+        issue['severity'],
+        issue['recipe_id'],
+        issue['title'],
+        issue['category'],
+        issue['code'],
+        issue['where'],
+        issue['evidence'],
+        issue['fix'],
+        updated_at,
+    ]
+
+class ExternalIssueSort:
+    """Bounded-memory sort of report rows by (severity, title).
+
+    Rows are buffered up to `run_size`, then sorted and spilled to a temporary
+    CSV run; `rows()` k-way merges the runs. Ties keep arrival order, so the
+    result matches a stable in-memory sort of the same rows.
+    """
+
+    def __init__(self, run_size: int = DEFAULT_SORT_RUN_SIZE, updated_at: str = ''):
+        self.run_size = run_size
+        self.updated_at = updated_at
+        self._buffer: List[Tuple[int, str, int, List[Any]]] = []
+        self._runs = []
+        self._seq = 0
+
+    def add(self, issue: Dict[str, Any]):
+        """Buffer one issue, spilling a sorted run when the buffer is full"""
+        rank = SEVERITY_ORDER.get(issue['severity'], 3)
+        self._buffer.append((rank, issue['title'] or '', self._seq, issue_to_row(issue, self.updated_at)))
+        self._seq += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        """Write the buffered rows to disk as one sorted run"""
+        self._buffer.sort(key=lambda entry: entry[:3])
+        run = tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8')
+        writer = csv.writer(run)
+        for rank, title, seq, row in self._buffer:
+            writer.writerow([rank, title, seq] + row)
+        run.seek(0)
+        self._runs.append(run)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(run) -> Iterator[Tuple[int, str, int, List[str]]]:
+        for record in csv.reader(run):
+            yield int(record[0]), record[1], int(record[2]), record[3:]
+
+    def rows(self) -> Iterator[List[Any]]:
+        """Yield all rows in report order"""
+        self._buffer.sort(key=lambda entry: entry[:3])
+        streams = [self._read_run(run) for run in self._runs]
+        streams.append(iter(self._buffer))
+        for _, _, _, row in heapq.merge(*streams, key=lambda entry: entry[:3]):
+            yield row
+
+    def close(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
+
+class SmallestN:
+    """Keeps the n smallest (key, item) pairs seen, in bounded memory"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._items: List[Tuple[Any, Any]] = []
+
+    def add(self, key: Any, item: Any):
+        self._items.append((key, item))
+        if len(self._items) >= 2 * self.n + 64:
+            self._items = heapq.nsmallest(self.n, self._items, key=lambda pair: pair[0])
+
+    def items(self) -> List[Any]:
+        return [item for _, item in heapq.nsmallest(self.n, self._items, key=lambda pair: pair[0])]
+
+class ReportSummary:
+    """Incremental counts and console examples for the end-of-run summary"""
+
+    def __init__(self):
+        self.recipes = 0
+        self.issues = 0
+        self.severity_counts = {'P0': 0, 'P1': 0, 'P2': 0}
+        self.forbidden_count = 0
+        self.ghost_count = 0
+        self.forbidden_examples = SmallestN(FORBIDDEN_EXAMPLES)
+        self.ghost_examples = SmallestN(GHOST_EXAMPLES)
+
+    def add(self, issue: Dict[str, Any]):
+        key = (issue['title'] or '', self.issues)
+        self.issues += 1
+        if issue['severity'] in self.severity_counts:
+            self.severity_counts[issue['severity']] += 1
+        if issue['code'] == 'FORBIDDEN_INGREDIENT':
+            self.forbidden_count += 1
+            self.forbidden_examples.add(key, issue)
+        elif issue['code'] == 'STEP_GHOST_ING':
+            self.ghost_count += 1
+            self.ghost_examples.add(key, issue)
+
+class ReportSink(ABC):
+    """Receives every issue exactly once, in check order.
+
+    Sinks aggregate or stream as issues arrive; `finish` runs once after the
+    last issue and `close` always runs. A new output format is one more sink,
+    not another pass over the issues.
+    """
+
+    @abstractmethod
+    def add(self, issue: Dict[str, Any]):
+        """Take one issue"""
+
+    def finish(self):
+        pass
+
+    def close(self):
+        pass
+
+class CsvReportSink(ReportSink):
+    """The triage CSV, sorted by severity then title"""
+
+    def __init__(self, path: str, run_started: datetime, run_size: int = DEFAULT_SORT_RUN_SIZE):
+        self.path = path
+        self._sorter = ExternalIssueSort(run_size=run_size, updated_at=run_started.isoformat())
+
+    def add(self, issue: Dict[str, Any]):
+        self._sorter.add(issue)
+
+    def finish(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_FIELDNAMES)
+            writer.writerows(self._sorter.rows())
+        print(f"\n💾 Full CSV report saved to: {self.path}")
+        print("   Open in Excel/Sheets for easy triage and filtering")
+
+    def close(self):
+        self._sorter.close()
+
+class JsonlReportSink(ReportSink):
+    """One JSON object per issue, written as it arrives"""
+
+    def __init__(self, path: str, run_started: datetime):
+        self.path = path
+        self.updated_at = run_started.isoformat()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def add(self, issue: Dict[str, Any]):
+        record = dict(zip(REPORT_FIELDNAMES, issue_to_row(issue, self.updated_at)))
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def finish(self):
+        print(f"📄 JSONL report saved to: {self.path}")
+
+    def close(self):
+        self._file.close()
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'P0': 'error', 'P1': 'warning', 'P2': 'note'}
+
+class SarifReportSink(ReportSink):
+    """SARIF 2.1.0 log for code-review tooling.
+
+    Results are streamed into the `results` array as they arrive; the rule
+    catalogue (one entry per issue code seen) is written after them.
+    """
+
+    def __init__(self, path: str, run_started: datetime):
+        self.path = path
+        self.run_started = run_started
+        self._rules: Dict[str, str] = {}
+        self._count = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(f'{{"version": "2.1.0", "$schema": "{SARIF_SCHEMA}", "runs": [{{"results": [')
+
+    @staticmethod
+    def _utc(moment: datetime) -> str:
+        return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def add(self, issue: Dict[str, Any]):
+        level = SARIF_LEVELS.get(issue['severity'], 'note')
+        self._rules.setdefault(issue['code'], level)
+        result = {
+            'ruleId': issue['code'],
+            'level': level,
+            'message': {'text': issue['evidence']},
+            'locations': [{'logicalLocations': [{
+                'name': issue['title'],
+                'fullyQualifiedName': f"meals/{issue['recipe_id']}/{issue['where']}",
+                'kind': 'object',
+            }]}],
+            'partialFingerprints': {'issueKey': f"{issue['recipe_id']}/{issue['code']}/{issue['where']}"},
+            'properties': {
+                'severity': issue['severity'],
+                'recipeId': issue['recipe_id'],
+                'category': issue['category'],
+                'suggestedFix': issue['fix'],
+            },
+        }
+        self._file.write((',' if self._count else '') + json.dumps(result, ensure_ascii=False))
+        self._count += 1
+
+    def finish(self):
+        tool = {'driver': {
+            'name': 'recipe-consistency-checker',
+            'rules': [{'id': code, 'defaultConfiguration': {'level': level}}
+                      for code, level in sorted(self._rules.items())],
+        }}
+        invocation = {
+            'executionSuccessful': True,
+            'startTimeUtc': self._utc(self.run_started),
+            'endTimeUtc': self._utc(datetime.now()),
+        }
+        self._file.write(f'], "tool": {json.dumps(tool)}, "invocations": [{json.dumps(invocation)}]}}]}}\n')
+        print(f"🧾 SARIF log saved to: {self.path}")
+
+    def close(self):
+        self._file.close()
+
+class ConsoleSummarySink(ReportSink):
+    """End-of-run console summary, fed from a ReportSummary"""
+
+    def __init__(self, summary: ReportSummary):
+        self.summary = summary
+
+    def add(self, issue: Dict[str, Any]):
+        self.summary.add(issue)
+
+    def finish(self):
+        summary = self.summary
+        p0_count = summary.severity_counts['P0']
+        
+        print("\n" + "=" * 70)
+        print("📊 CONSISTENCY CHECK RESULTS")
+        print("=" * 70)
+        print(f"\n✅ Total recipes analyzed: {summary.recipes}")
+        print(f"⚠️  Total issues found: {summary.issues}")
+        print(f"\n🚨 P0 Critical: {p0_count}")
+        print(f"   - Forbidden ingredients (low-GI violations): {summary.forbidden_count}")
+        print(f"   - Ghost ingredients in instructions: {summary.ghost_count}")
+        print(f"⚠️  P1 High: {summary.severity_counts['P1']}")
+        print(f"📋 P2 Medium: {summary.severity_counts['P2']}")
+        
+        # Show P0 issues by type
+        if p0_count > 0:
+            print("\n" + "=" * 70)
+            print("🚨 P0 CRITICAL ISSUES (Immediate Action Required)")
+            print("=" * 70)
+            
+            # Show forbidden ingredients first
+            if summary.forbidden_count:
+                print(f"\n🚫 FORBIDDEN INGREDIENTS ({summary.forbidden_count} recipes)")
+                print("   Low-GI violations - using high-glycemic items:")
+                for i, issue in enumerate(summary.forbidden_examples.items(), 1):
+                    print(f"\n{i}. {issue['title']} ({issue['category']})")
+                    print(f"   Issue: {issue['evidence']}")
+                    print(f"   Fix: {issue['fix']}")
+                if summary.forbidden_count > FORBIDDEN_EXAMPLES:
+                    print(f"\n... and {summary.forbidden_count - FORBIDDEN_EXAMPLES} more forbidden ingredient issues")
+            
+            # Show ghost ingredients
+            if summary.ghost_count and summary.ghost_count <= GHOST_EXAMPLES:
+                print(f"\n👻 GHOST INGREDIENTS ({summary.ghost_count} recipes)")
+                for i, issue in enumerate(summary.ghost_examples.items(), 1):
+                    print(f"{i}. {issue['title']}: {issue['evidence']}")
+
+# Database write-back (mirrors recipeAuditIssues in shared/schema.ts)
+AUDIT_TABLE = 'recipe_audit_issues'
+AUDIT_COLUMNS = ['recipe_id', 'issue_code', 'where', 'severity', 'title', 'category', 'evidence', 'suggested_fix']
+AUDIT_COLUMN_LIST = ', '.join(f'"{column}"' for column in AUDIT_COLUMNS)
+AUDIT_KEY = 'recipe_id, issue_code, "where"'
+
+# The table and its unique key index belong to the drizzle schema (npm run db:push);
+# a run only creates the staging table it copies into
+AUDIT_STAGING_SQL = """
+    CREATE TEMP TABLE audit_staging (
+        recipe_id varchar, issue_code varchar, "where" text, severity varchar,
+        title text, category varchar, evidence text, suggested_fix text
+    ) ON COMMIT DROP;
+"""
+
+AUDIT_COPY_SQL = f"COPY audit_staging ({AUDIT_COLUMN_LIST}) FROM STDIN WITH (FORMAT csv)"
+
+# now() is fixed for the whole transaction, so a run stamps one last_seen
+AUDIT_UPSERT_SQL = f"""
+    INSERT INTO {AUDIT_TABLE} ({AUDIT_COLUMN_LIST}, first_seen, last_seen)
+    SELECT DISTINCT ON ({AUDIT_KEY}) {AUDIT_COLUMN_LIST}, now(), now()
+    FROM audit_staging
+    ORDER BY {AUDIT_KEY}, severity
+    ON CONFLICT ({AUDIT_KEY}) DO UPDATE SET
+        severity = EXCLUDED.severity,
+        title = EXCLUDED.title,
+        category = EXCLUDED.category,
+        evidence = EXCLUDED.evidence,
+        suggested_fix = EXCLUDED.suggested_fix,
+        last_seen = EXCLUDED.last_seen
+"""
+
+# Issues the run evaluated but did not reproduce have been resolved
+AUDIT_RESOLVE_SQL = f"DELETE FROM {AUDIT_TABLE} WHERE issue_code = ANY(%s) AND last_seen < now()"
+
+# Same, limited to the recipes a partial run or a dump covered
+AUDIT_RESOLVE_RECIPES_SQL = (f"DELETE FROM {AUDIT_TABLE} WHERE recipe_id = ANY(%s) "
+                             f"AND issue_code = ANY(%s) AND last_seen < now()")
+
+# Codes from the per-recipe checks, evaluated on every run
+RECIPE_ISSUE_CODES = [
+    'DESC_SUB_CONFLICT', 'STEP_GHOST_ING', 'ING_UNUSED', 'IMG_MISSING',
+    'IMG_GENERIC_NAME', 'IMG_META_MISMATCH', 'FORBIDDEN_INGREDIENT',
+]
+
+# Codes from the optional corpus-level stages. These compare a recipe with the
+# rest of the catalog, so only a run of that stage over the whole catalog
+# can reproduce or resolve them
+CORPUS_STAGE_CODES = {
+    'images': ['IMG_DUPLICATE', 'IMG_NEAR_DUPLICATE'],
+    'near_dups': ['RECIPE_NEAR_DUP'],
+    'nutrition': ['NUTR_KCAL_MISMATCH', 'NUTR_GI_MISMATCH', 'NUTR_OUTLIER'],
+}
+
+class AuditIssueSink(ReportSink):
+    """Bulk write-back of a full run's issues into recipe_audit_issues.
+
+    Issues are spooled to a temporary CSV as they arrive; `commit()` loads
+    them in one transaction: COPY into a temp staging table, then one
+    set-based upsert and one delete. Open issues keep their first_seen.
+    Only issues with a code the run evaluated (`codes`) are resolved.
+    """
+
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = database_url
+        self.count = 0
+        # Extended with a corpus stage's codes once that stage has run
+        self.codes: List[str] = list(RECIPE_ISSUE_CODES)
+        # Set for a run that reached only some recipes (see load())
+        self.recipe_ids: Optional[List[str]] = None
+        self._spool = tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._spool)
+
+    def add(self, issue: Dict[str, Any]):
+        self._writer.writerow([
+            issue['recipe_id'], issue['code'], issue['where'], issue['severity'],
+            issue['title'], issue['category'], issue['evidence'], issue['fix'],
+        ])
+        self.count += 1
+
+    def finish(self):
+        upserted, resolved = self.commit()
+        print(f"🗄️  {AUDIT_TABLE}: {upserted} issues upserted, {resolved} resolved")
+
+    def commit(self) -> Tuple[int, int]:
+        """Load the spooled issues on a new connection; returns (rows upserted, rows resolved)"""
+        conn = psycopg2.connect(self.database_url)
+        try:
+            return self.load(conn, self.recipe_ids, self.codes)
+        finally:
+            conn.close()
+
+    def load(self, conn, recipe_ids: Optional[List[str]] = None,
+             codes: List[str] = RECIPE_ISSUE_CODES) -> Tuple[int, int]:
+        """Load the spooled issues in one transaction on an open connection.
+
+        Stale issues with one of `codes` are resolved; with `recipe_ids`, only
+        those recipes', for a run that covered part of the table.
+        """
+        self._spool.seek(0)
+        with conn, conn.cursor() as cursor:
+            cursor.execute(AUDIT_STAGING_SQL)
+            cursor.copy_expert(AUDIT_COPY_SQL, self._spool)
+            cursor.execute(AUDIT_UPSERT_SQL)
+            upserted = cursor.rowcount
+            if recipe_ids is None:
+                cursor.execute(AUDIT_RESOLVE_SQL, (list(codes),))
+            else:
+                cursor.execute(AUDIT_RESOLVE_RECIPES_SQL, (list(recipe_ids), list(codes)))
+            resolved = cursor.rowcount
+        return upserted, resolved
+
+    def close(self):
+        self._spool.close()
+
+def fetch_recipes(conn, stream: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                  query: str = RECIPE_QUERY) -> Iterator[Dict[str, Any]]:
+    """Yield recipes from the meals table.
+
+    With `stream`, a named (server-side) cursor pulls `batch_size` rows per
+    round trip so only one batch is ever held in memory.
+    """
+    if stream:
+        cursor = conn.cursor(name='recipe_consistency_checker')
+        cursor.itersize = batch_size
+    else:
+        cursor = conn.cursor()
+    try:
+        cursor.execute(query)
+        rows = cursor if stream else cursor.fetchall()
+        for row in rows:
+            yield dict(row)
+    finally:
+        cursor.close()
+
+# ============================================================================
+# WATCH MODE
+# ============================================================================
+
+WATCH_CHANNEL = 'meals_changed'
+
+# Quiet period that closes a burst of edits, and the most a burst may be held
+DEFAULT_WATCH_DEBOUNCE_MS = 200
+DEFAULT_WATCH_MAX_DELAY_MS = 600
+
+# Notify with the recipe id whenever a checked column changes or a row
+# comes or goes; identical notifications in one transaction are merged
+WATCH_TRIGGER_SQL = f"""
+    CREATE OR REPLACE FUNCTION notify_meals_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{WATCH_CHANNEL}', COALESCE(NEW.id, OLD.id));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    DROP TRIGGER IF EXISTS meals_changed ON meals;
+    CREATE TRIGGER meals_changed
+        AFTER INSERT OR DELETE OR UPDATE OF {', '.join(HASHED_FIELDS)}, category ON meals
+        FOR EACH ROW EXECUTE FUNCTION notify_meals_changed();
+"""
+
+WATCH_FETCH_QUERY = f"SELECT {', '.join(RECIPE_COLUMNS)} FROM meals WHERE id = ANY(%s) ORDER BY id"
+
+def iter_changed_batches(conn, debounce: float = DEFAULT_WATCH_DEBOUNCE_MS / 1000,
+                         max_delay: float = DEFAULT_WATCH_MAX_DELAY_MS / 1000) -> Iterator[Tuple[Set[str], float]]:
+    """Yield (recipe ids, monotonic time of the first notification) per burst of edits.
+
+    Blocks on the LISTENing connection's socket. A burst closes after
+    `debounce` without notifications, or `max_delay` after it began, so a
+    steady stream of edits is still re-checked promptly.
+    """
+    pending: Set[str] = set()
+    first_at = last_at = 0.0
+    while True:
+        # Notifications can also arrive while our own queries run
+        if not conn.notifies:
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(last_at + debounce, first_at + max_delay) - time.monotonic())
+            readable, _, _ = select.select([conn], [], [], timeout)
+            if readable:
+                conn.poll()
+        
+        now = time.monotonic()
+        for notify in conn.notifies:
+            if not pending:
+                first_at = now
+            pending.add(notify.payload)
+            last_at = now
+        conn.notifies.clear()
+        
+        if pending and (now >= last_at + debounce or now >= first_at + max_delay):
+            yield pending, first_at
+            pending = set()
+
+def recheck_recipes(conn, recipe_ids: Set[str]) -> List[Dict[str, Any]]:
+    """Re-run the checks for the given recipes and replace their stored issues.
+
+    Recipes that no longer exist simply have their issues resolved.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(WATCH_FETCH_QUERY, (sorted(recipe_ids),))
+        recipes = cursor.fetchall()
+    
+    issues = [issue for recipe in recipes for issue in check_recipe(dict(recipe))]
+    store_recipe_issues(conn, issues, recipe_ids)
+    return issues
+
+def store_recipe_issues(conn, issues: List[Dict[str, Any]], recipe_ids: Set[str]):
+    """Replace the stored issues of the given recipes with `issues`"""
+    sink = AuditIssueSink()
+    try:
+        for issue in issues:
+            sink.add(issue)
+        sink.load(conn, recipe_ids=recipe_ids)
+    finally:
+        sink.close()
+
+def watch_meals(database_url: str, debounce_ms: int = DEFAULT_WATCH_DEBOUNCE_MS,
+                max_delay_ms: int = DEFAULT_WATCH_MAX_DELAY_MS):
+    """Re-check recipes as they change, on a single database connection"""
+    conn = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(WATCH_TRIGGER_SQL)
+            cursor.execute(f"LISTEN {WATCH_CHANNEL}")
+        print(f"\n👂 Watching meals for changes on '{WATCH_CHANNEL}' (Ctrl+C to stop)...")
+        
+        batches = iter_changed_batches(conn, debounce_ms / 1000, max_delay_ms / 1000)
+        for recipe_ids, first_at in batches:
+            issues = recheck_recipes(conn, recipe_ids)
+            p0 = [issue for issue in issues if issue['severity'] == 'P0']
+            latency_ms = (time.monotonic() - first_at) * 1000
+            print(f"🔁 {datetime.now():%H:%M:%S} re-checked {len(recipe_ids)} recipe(s): "
+                  f"{len(issues)} issues, {len(p0)} P0, stored {latency_ms:.0f} ms after the first edit")
+            for issue in p0:
+                print(f"   🚨 {issue['title']}: {issue['evidence']}")
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped")
+    finally:
+        conn.close()
+    return 0
+
+# ============================================================================
+# AUTO-FIX
+# ============================================================================
+
+# Issues whose suggested fix is a deterministic text substitution
+FIXABLE_ISSUE_CODES = ('FORBIDDEN_INGREDIENT', 'DESC_SUB_CONFLICT')
+
+# Postgres hashes the checked text on read and again inside the UPDATE, so a
+# recipe edited after it was read is left alone (optimistic concurrency)
+FIX_FETCH_QUERY = f"""
+    SELECT {', '.join(RECIPE_COLUMNS)}, md5(row(ingredients, instructions)::text) AS row_hash
+    FROM meals
+    ORDER BY name
+"""
+
+FIX_UPDATE_SQL = """
+    UPDATE meals AS m
+    SET ingredients = v.ingredients, instructions = v.instructions
+    FROM (VALUES %s) AS v(id, row_hash, ingredients, instructions)
+    WHERE m.id = v.id AND md5(row(m.ingredients, m.instructions)::text) = v.row_hash
+    RETURNING m.id
+"""
+FIX_UPDATE_TEMPLATE = '(%s, %s, %s::text[], %s)'
+
+# Rows per UPDATE statement; all statements share one transaction
+FIX_PAGE_SIZE = 1000
+
+# Field of the instructions in a rewrite span; ingredient lines are 0, 1, ...
+INSTRUCTIONS_FIELD = -1
+
+# Words of a phrase run, as PHRASE_WORD_SEPARATOR splits it
+FIX_WORD_PATTERN = re.compile(r'\S+')
+
+def match_case(original: str, replacement: str) -> str:
+    """replacement, capitalised when the text it replaces was"""
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+def substitute_spans(text: str, spans: List[Tuple[int, int, str]]) -> str:
+    """text with each non-overlapping (start, end, replacement) span replaced"""
+    parts = []
+    last = 0
+    for start, end, replacement in sorted(spans):
+        parts.append(text[last:start])
+        parts.append(match_case(text[start:end], replacement))
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+def phrase_spans(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, canonical) spans of the ingredient phrases the tokenizer recognises in text"""
+    lower = text.lower()
+    if len(lower) != len(text):
+        # Case folding moved the offsets; leave the text to an editor
+        return []
+    spans = []
+    for run in PHRASE_RUN_PATTERN.finditer(lower):
+        words = [(run.start() + m.start(), run.start() + m.end()) for m in FIX_WORD_PATTERN.finditer(run.group())]
+        resolved = [TOKEN_RESOLVER.rewrite(lower[start:end]) for start, end in words]
+        for first, last, canonical in INGREDIENT_TRIE.matches(resolved):
+            spans.append((words[first][0], words[last - 1][1], canonical))
+    return spans
+
+def recognised_phrases(texts: Iterator[str]) -> Counter:
+    """How often each canonical ingredient name is recognised across texts"""
+    return Counter(
+        canonical for text in texts if text
+        for canonical in INGREDIENT_TRIE.find(TOKEN_RESOLVER.rewrite(text.lower()))
+    )
+
+def low_gi_alternative(item: str, allowed: List[str]) -> str:
+    """The allowed alternative that replaces a forbidden item; plural for a plural item when the rules have one"""
+    if light_stem(item) != item:
+        for alternative in allowed:
+            if light_stem(alternative) != alternative:
+                return alternative
+    return allowed[0]
+
+def forbidden_replacements(text: str, rules: Dict[str, Any],
+                           only: Optional[Set[str]] = None) -> Tuple[List[Tuple[int, int, str]], Set[str]]:
+    """(start, end, alternative) spans for one category's forbidden items in text, and the items they replace.
+
+    Same matches as check D, minus those inside a hyphenated compound, an
+    allowed alternative ('potato' in 'sweet potato') or a longer recognised
+    phrase ('bagel' in 'everything bagel seasoning'); a longer alias of the
+    item itself ('whole wheat flour') is replaced whole. Longer items win
+    over items nested in them ('brown sugar' over 'sugar'), and items side
+    by side ('loaf bread', 'bread rolls') become a single alternative. With
+    `only`, just those items are replaced.
+    """
+    lower = text.lower()
+    if len(lower) != len(text):
+        return [], set()
+    hits, is_protected = find_forbidden(lower)
+    
+    phrases = phrase_spans(text)
+    allowed_spans = [
+        (start, start + len(alternative))
+        for alternative in rules['allowed']
+        for start in (m.start() for m in re.finditer(re.escape(alternative), lower))
+    ]
+    candidates = []
+    for item in rules['forbidden']:
+        if only is not None and item not in only:
+            continue
+        for start, end in hits.get(item, ()):
+            if (is_protected(start, end) or lower[start - 1:start] == '-' or lower[end:end + 1] == '-'
+                    or any(a_start <= start and end <= a_end for a_start, a_end in allowed_spans)):
+                continue
+            enclosing = [
+                (p_start, p_end, canonical) for p_start, p_end, canonical in phrases
+                if p_start <= start and end <= p_end and p_end - p_start > end - start
+            ]
+            if enclosing:
+                p_start, p_end, canonical = enclosing[0]
+                if canonical != ALIAS_MAP.get(item, item):
+                    continue
+                start, end = p_start, p_end
+            candidates.append((start, -end, item))
+    
+    spans = []
+    replaced = set()
+    last_end = 0
+    for start, negative_end, item in sorted(candidates):
+        if start < last_end:
+            continue
+        end = -negative_end
+        if spans and not lower[spans[-1][1]:start].strip():
+            # One thing named by several items; the last one is the noun
+            start = spans.pop()[0]
+        spans.append((start, end, low_gi_alternative(item, rules['allowed'])))
+        replaced.add(item)
+        last_end = end
+    return spans, replaced
+
+def opens_sentence(text: str, start: int) -> bool:
+    """True if the text at start begins a sentence"""
+    before = text[:start].rstrip()
+    return not before or before[-1] in '.!?:;'
+
+def fix_rewrites(recipe: Dict[str, Any]) -> Dict[Tuple[str, str], List[Tuple[int, int, int, str]]]:
+    """Candidate rewrites for a recipe, keyed by the (code, where) of the issue each should clear.
+
+    A rewrite is a list of (field, start, end, replacement) spans, where
+    field is an ingredient line's index or INSTRUCTIONS_FIELD.
+    DESC_SUB_CONFLICT: every recognised mention of the replaced ingredient
+    becomes the new one, worded as the description words it.
+    FORBIDDEN_INGREDIENT, per category: forbidden items in the ingredient
+    list become an allowed alternative, and the instructions' mentions of
+    the same items follow.
+    """
+    fields = list(enumerate(recipe.get('ingredients') or []))
+    fields.append((INSTRUCTIONS_FIELD, recipe.get('instructions') or ''))
+    rewrites = {}
+    
+    conflicts = set(substitution_conflicts(RecipeAnalysis(recipe)))
+    replacements = {}
+    for new_item, old_item, new_phrase in described_substitutions(recipe.get('description') or ''):
+        if (new_item, old_item) in conflicts:
+            replacements.setdefault(old_item, new_phrase)
+    spans = [
+        (field, start, end, replacements[canonical])
+        for field, text in fields if text
+        for start, end, canonical in phrase_spans(text) if canonical in replacements
+    ]
+    if spans:
+        rewrites[('DESC_SUB_CONFLICT', 'description+ingredients')] = spans
+    
+    for category, rules in CRITICAL_SUBSTITUTIONS.items():
+        spans = []
+        replaced_items: Set[str] = set()
+        for field, text in fields:
+            if not text:
+                continue
+            if field == INSTRUCTIONS_FIELD:
+                if not replaced_items:
+                    break
+                field_spans, _ = forbidden_replacements(text, rules, only=replaced_items)
+                # A step that opens with an item uses it as a verb ('Toast the buns')
+                field_spans = [span for span in field_spans if not opens_sentence(text, span[0])]
+            else:
+                field_spans, replaced = forbidden_replacements(text, rules)
+                replaced_items |= replaced
+            spans.extend((field, start, end, alternative) for start, end, alternative in field_spans)
+        if spans:
+            rewrites[('FORBIDDEN_INGREDIENT', forbidden_where(category))] = spans
+    return rewrites
+
+def apply_rewrite(recipe: Dict[str, Any], spans: List[Tuple[int, int, int, str]]
+                  ) -> Optional[Tuple[List[str], str]]:
+    """The recipe's (ingredients, instructions) with a rewrite applied, or None if it changes
+    a recognised ingredient phrase besides the ones it replaces.
+
+    Of two overlapping spans, the first is kept.
+    """
+    ingredients = list(recipe.get('ingredients') or [])
+    instructions = recipe.get('instructions') or ''
+    kept: Dict[int, List[Tuple[int, int, str]]] = {}
+    for field, start, end, replacement in sorted(spans):
+        field_spans = kept.setdefault(field, [])
+        if not field_spans or start >= field_spans[-1][1]:
+            field_spans.append((start, end, replacement))
+    
+    def text_of(field: int) -> str:
+        return instructions if field == INSTRUCTIONS_FIELD else ingredients[field]
+    
+    removed = recognised_phrases(text_of(field)[start:end] for field in kept for start, end, _ in kept[field])
+    inserted = recognised_phrases(replacement for field in kept for _, _, replacement in kept[field])
+    before = recognised_phrases(ingredients + [instructions])
+    
+    for field, field_spans in kept.items():
+        if field == INSTRUCTIONS_FIELD:
+            instructions = substitute_spans(instructions, field_spans)
+        else:
+            ingredients[field] = substitute_spans(ingredients[field], field_spans)
+    
+    if removed - before or before - removed + inserted != recognised_phrases(ingredients + [instructions]):
+        return None
+    return ingredients, instructions
+
+def issue_keys(issues: List[Dict[str, Any]]) -> Set[Tuple[str, str]]:
+    return {(issue['code'], issue['where']) for issue in issues}
+
+def verified_rewrite(recipe: Dict[str, Any], spans: List[Tuple[int, int, int, str]],
+                     issues: Set[Tuple[str, str]], targets: Set[Tuple[str, str]]) -> Optional[Tuple[List[str], str]]:
+    """apply_rewrite's result if the rewritten recipe clears every target issue and raises none
+    it did not have, else None"""
+    rewritten = apply_rewrite(recipe, spans)
+    if rewritten is None:
+        return None
+    ingredients, instructions = rewritten
+    after = issue_keys(run_checks(dict(recipe, ingredients=ingredients, instructions=instructions)))
+    if after & targets or after - issues:
+        return None
+    return rewritten
+
+def plan_fixes(recipes: Iterator[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Verified fixes for every recipe with fixable issues, and counts for the summary.
+
+    Each fixable issue's rewrite is checked on its own and kept only if it
+    clears that issue, raises none the recipe did not have and changes no
+    other recognised ingredient phrase. The kept rewrites are then checked
+    again together; if they fail together, the recipe is left alone.
+    """
+    plans = []
+    counts = {'recipes': 0, 'fixable': 0, 'cleared': 0, 'unfixable': 0, 'rejected': 0}
+    for recipe in recipes:
+        counts['recipes'] += 1
+        issues = issue_keys(run_checks(recipe))
+        fixable = {key for key in issues if key[0] in FIXABLE_ISSUE_CODES}
+        if not fixable:
+            continue
+        counts['fixable'] += len(fixable)
+        
+        rewrites = fix_rewrites(recipe)
+        spans = []
+        cleared = set()
+        rewritten = None
+        for key in sorted(fixable & rewrites.keys()):
+            rewritten_alone = verified_rewrite(recipe, rewrites[key], issues, {key})
+            if rewritten_alone is None:
+                counts['rejected'] += 1
+            else:
+                spans.extend(rewrites[key])
+                cleared.add(key)
+                rewritten = rewritten_alone
+        
+        if len(cleared) > 1:
+            rewritten = verified_rewrite(recipe, spans, issues, cleared)
+        if rewritten is None:
+            counts['rejected'] += len(cleared)
+            cleared = set()
+        counts['cleared'] += len(cleared)
+        counts['unfixable'] += len(fixable) - len(cleared)
+        if rewritten is not None:
+            ingredients, instructions = rewritten
+            plans.append({'recipe': recipe, 'ingredients': ingredients, 'instructions': instructions})
+    return plans, counts
+
+def recipe_lines(ingredients: List[str], instructions: str) -> List[str]:
+    return (['ingredients:'] + [f'  - {line}' for line in ingredients] +
+            ['instructions:'] + [f'  {line}' for line in instructions.splitlines()])
+
+def fix_diff(plan: Dict[str, Any]) -> List[str]:
+    """Unified diff of one planned fix"""
+    recipe = plan['recipe']
+    label = f"{recipe['name']} [{recipe['id']}]"
+    return list(difflib.unified_diff(
+        recipe_lines(recipe.get('ingredients') or [], recipe.get('instructions') or ''),
+        recipe_lines(plan['ingredients'], plan['instructions']),
+        fromfile=label, tofile=f'{label} (fixed)', lineterm='', n=1,
+    ))
+
+def apply_fixes(conn, plans: List[Dict[str, Any]]) -> Set[str]:
+    """Write every planned fix in one transaction; returns the ids whose row hash still matched"""
+    rows = [
+        (str(plan['recipe']['id']), plan['recipe']['row_hash'], plan['ingredients'], plan['instructions'])
+        for plan in plans
+    ]
+    with conn, conn.cursor() as cursor:
+        updated = execute_values(cursor, FIX_UPDATE_SQL, rows, template=FIX_UPDATE_TEMPLATE,
+                                 page_size=FIX_PAGE_SIZE, fetch=True)
+    return {row['id'] for row in updated}
+
+def fix_meals(database_url: str, dry_run: bool = False, diff_path: Optional[str] = None,
+              write_db: bool = False) -> int:
+    """Apply the suggested low-GI fixes to meals, then re-check the touched recipes.
+
+    The re-check runs on the rewritten text in memory; only with `write_db`
+    does it replace the touched recipes' rows in the audit table.
+    """
+    conn = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    try:
+        print("\n📥 Fetching recipes from database...")
+        with conn, conn.cursor() as cursor:
+            cursor.execute(FIX_FETCH_QUERY)
+            recipes = [dict(row) for row in cursor.fetchall()]
+        
+        plans, counts = plan_fixes(recipes)
+        diff = [line for plan in plans for line in fix_diff(plan)]
+        if diff_path:
+            os.makedirs(os.path.dirname(diff_path) or '.', exist_ok=True)
+            with open(diff_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(diff) + '\n')
+        elif dry_run:
+            print()
+            print('\n'.join(diff))
+        
+        print(f"\n🩹 {counts['recipes']} recipes, {counts['fixable']} fixable issues: {len(plans)} recipes rewritten "
+              f"to clear {counts['cleared']}; {counts['unfixable']} left for an editor "
+              f"({counts['rejected']} where a rewrite did not clear its issue, raised new ones "
+              f"or changed other ingredients)")
+        if diff_path:
+            print(f"   Diff saved to: {diff_path}")
+        if dry_run or not plans:
+            print("\n✅ Dry run: no changes written\n" if dry_run else "\n✅ Nothing to fix\n")
+            return 0
+        
+        start = time.perf_counter()
+        applied = apply_fixes(conn, plans)
+        write_seconds = time.perf_counter() - start
+        print(f"✅ Updated {len(applied)} recipes in one transaction ({write_seconds * 1000:.0f} ms)"
+              + (f"; {len(plans) - len(applied)} skipped, edited since they were read" if len(applied) < len(plans) else ''))
+        
+        start = time.perf_counter()
+        issues = [
+            issue for plan in plans if str(plan['recipe']['id']) in applied
+            for issue in check_recipe(dict(plan['recipe'], ingredients=plan['ingredients'],
+                                           instructions=plan['instructions']))
+        ]
+        if write_db and applied:
+            store_recipe_issues(conn, issues, applied)
+        remaining = [issue for issue in issues if issue['code'] in FIXABLE_ISSUE_CODES]
+        print(f"🔁 Re-checked {len(applied)} recipes ({(time.perf_counter() - start) * 1000:.0f} ms): "
+              f"{len(remaining)} fixable issues remain, {len(issues)} issues in total\n")
+    finally:
+        conn.close()
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description='GlycoGuide recipe consistency checker')
+    read_mode = parser.add_mutually_exclusive_group()
+    read_mode.add_argument('--input', metavar='PATH',
+                           help='check a JSONL or CSV dump of meals instead of the database')
+    read_mode.add_argument('--export', metavar='PATH',
+                           help='dump meals to a JSONL or CSV file with COPY and exit')
+    read_mode.add_argument('--compile-rules', action='store_true',
+                           help=f'compile {os.path.basename(RULE_PACK_FILE)} into '
+                                f'{os.path.basename(RULE_ARTIFACT_FILE)}, loaded while it matches the pack, and exit')
+    read_mode.add_argument('--watch', action='store_true',
+                           help=f'stay running and re-check recipes as they change (LISTEN/NOTIFY), '
+                                f'keeping their issues in {AUDIT_TABLE} current')
+    read_mode.add_argument('--fix', action='store_true',
+                           help='rewrite ingredients/instructions to apply the suggested fixes for '
+                                f'{" and ".join(FIXABLE_ISSUE_CODES)} in one transaction, then re-check those recipes '
+                                '(stored with --write-db)')
+    read_mode.add_argument('--stream', action='store_true',
+                           help='fetch with a server-side cursor and spill the report to disk as it is produced')
+    read_mode.add_argument('--keyset', action='store_true',
+                           help='page through meals by id in short transactions, prefetching the next page '
+                                'while the current one is checked')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='with --keyset, page through a JSONL or CSV dump of meals instead of the database')
+    parser.add_argument('--input-format', choices=sorted(set(INPUT_FORMATS.values())),
+                        help='format for --input/--export/--replay when the extension does not say')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'rows per round trip in --stream mode (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'rows per page in --keyset mode (default {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH,
+                        help=f'pages fetched ahead of the checks in --keyset mode (default {DEFAULT_PREFETCH})')
+    parser.add_argument('--statement-timeout', type=int, default=DEFAULT_STATEMENT_TIMEOUT_MS,
+                        help=f'per-page statement timeout in ms for --keyset (default {DEFAULT_STATEMENT_TIMEOUT_MS})')
+    parser.add_argument('--debounce', type=int, default=DEFAULT_WATCH_DEBOUNCE_MS,
+                        help=f'ms without edits that closes a burst in --watch mode (default {DEFAULT_WATCH_DEBOUNCE_MS})')
+    parser.add_argument('--max-delay', type=int, default=DEFAULT_WATCH_MAX_DELAY_MS,
+                        help=f'longest a burst is held in --watch mode, in ms (default {DEFAULT_WATCH_MAX_DELAY_MS})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='with --fix, print the diff of the planned rewrites and write nothing')
+    parser.add_argument('--diff', metavar='PATH', help='with --fix, save the diff of the rewrites to a file')
+    parser.add_argument('--sort-run-size', type=int, default=DEFAULT_SORT_RUN_SIZE,
+                        help=f'report rows sorted in memory before spilling a run (default {DEFAULT_SORT_RUN_SIZE})')
+    parser.add_argument('--budget', type=float, metavar='SECONDS',
+                        help='check recipes in priority order (new or edited first; prior P0s at most '
+                             f'{PRIOR_P0_SHARE:.0%}% of the rest, then categories with high issue rates) until '
+                             'SECONDS have passed, carrying the rest over to the next budgeted run; the image, '
+                             'near-duplicate and nutrition stages run only if every recipe was checked in time, '
+                             'and the run fails if new or edited recipes were not reached')
+    parser.add_argument('--coverage-file', default=COVERAGE_FILE,
+                        help=f'record of the recipes each --budget run reached (default {COVERAGE_FILE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reuse cached results for recipes whose content and rules are unchanged')
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help=f'result cache for --incremental (default {CACHE_FILE})')
+    parser.add_argument('--images', action='store_true',
+                        help='hash recipe images and report ones reused across recipes (hashing needs Pillow)')
+    parser.add_argument('--image-root', action='append', metavar='DIR',
+                        help=f'directory image URLs are resolved under; repeatable (default {" and ".join(DEFAULT_IMAGE_ROOTS)})')
+    parser.add_argument('--image-distance', type=int, default=DEFAULT_IMAGE_DISTANCE,
+                        help=f'max differing hash bits for near-duplicate images (default {DEFAULT_IMAGE_DISTANCE})')
+    parser.add_argument('--image-cache', default=IMAGE_HASH_CACHE_FILE,
+                        help=f'image hash cache for --images (default {IMAGE_HASH_CACHE_FILE})')
+    parser.add_argument('--near-dups', action='store_true',
+                        help='report near-duplicate recipes with MinHash/LSH (needs NumPy)')
+    parser.add_argument('--near-dup-threshold', type=float, default=DEFAULT_NEAR_DUP_THRESHOLD,
+                        help=f'similarity of ingredients and steps that counts as a near-duplicate '
+                             f'(default {DEFAULT_NEAR_DUP_THRESHOLD})')
+    parser.add_argument('--signature-cache', default=SIGNATURE_CACHE_FILE,
+                        help=f'MinHash signature cache for --near-dups (default {SIGNATURE_CACHE_FILE})')
+    parser.add_argument('--nutrition', action='store_true',
+                        help='check calories, macros and glycemic index across the catalog (needs NumPy; keeps '
+                             'a row of numbers per recipe in memory, also with --stream)')
+    parser.add_argument('--fuzzy-distance', type=int, default=RULES['fuzzy_distance'],
+                        help=f'edit distance for correcting misspelled ingredient names, 0 to turn correction off '
+                             f'(default {RULES["fuzzy_distance"]}, at most {TOKEN_RESOLVER.max_distance})')
+    parser.add_argument('--token-cache-size', type=int, default=DEFAULT_TOKEN_CACHE_SIZE,
+                        help=f'token resolutions memoised per process (default {DEFAULT_TOKEN_CACHE_SIZE})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='check recipes on a pool of N processes (default 1: in-process)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'recipes per worker task (default {DEFAULT_CHUNK_SIZE}; at most {BUDGET_CHUNK_SIZE} with --budget)')
+    parser.add_argument('--slowest', type=int, default=DEFAULT_SLOWEST,
+                        help=f'slowest recipes listed in the metrics file (default {DEFAULT_SLOWEST})')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'capture a cProfile of the run as {PROFILE_FILE} next to the report '
+                             '(covers this process only; combine with --workers 1)')
+    parser.add_argument('--output', default=REPORT_FILE, help=f'CSV report path (default {REPORT_FILE})')
+    parser.add_argument('--jsonl', metavar='PATH', help='also write the issues as JSON lines')
+    parser.add_argument('--sarif', metavar='PATH', help='also write the issues as a SARIF 2.1.0 log')
+    parser.add_argument('--write-db', action='store_true',
+                        help=f'also load the issues into the {AUDIT_TABLE} table, created by npm run db:push (issues of the checks that ran '
+                             'and were not reproduced are deleted; after a --budget run or from a dump, only '
+                             'for the recipes it read)')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main function"""
+    args = parse_args(argv)
+    
+    print("🔍 GlycoGuide Production Recipe Consistency Checker")
+    print("=" * 70)
+    
+    if args.compile_rules:
+        rules = write_rule_artifact()
+        print(f"✅ Compiled rule pack v{rules['version']} ({rules['source_digest'][:12]}) to {RULE_ARTIFACT_FILE}")
+        return 0
+    
+    try:
+        TOKEN_RESOLVER.configure(args.fuzzy_distance, args.token_cache_size)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    
+    if args.replay and not args.keyset:
+        print("❌ ERROR: --replay only applies to --keyset")
+        sys.exit(1)
+    
+    # Connect to database
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url and (not (args.input or args.replay) or args.write_db):
+        print("❌ ERROR: DATABASE_URL not set")
+        sys.exit(1)
+    
+    if args.export:
+        print(f"\n📤 Exporting meals to {args.export}...")
+        conn = psycopg2.connect(database_url)
+        try:
+            size = export_meals(conn, args.export, args.input_format)
+        finally:
+            conn.close()
+        print(f"✅ Wrote {size} bytes")
+        return 0
+    
+    if args.watch:
+        return watch_meals(database_url, debounce_ms=args.debounce, max_delay_ms=args.max_delay)
+    
+    if args.fix:
+        return fix_meals(database_url, dry_run=args.dry_run, diff_path=args.diff, write_db=args.write_db)
+    
+    if args.budget is not None:
+        if args.budget <= 0:
+            print("❌ ERROR: --budget must be a positive number of seconds")
+            sys.exit(1)
+        if args.stream or args.keyset:
+            print("❌ ERROR: --budget orders the whole catalog before checking; it cannot be combined "
+                  "with --stream or --keyset")
+            sys.exit(1)
+    # Fetching counts against the budget too
+    budget_start = time.monotonic()
+    
+    conn = None
+    source = None
+    coverage = None
+    
+    # Fetch recipes
+    if args.input:
+        print(f"\n📥 Reading recipes from {args.input}...")
+        recipes = iter_recipe_file(args.input, args.input_format)
+    elif args.keyset:
+        if args.replay:
+            print(f"\n📥 Paging recipes from {args.replay} by id ({args.page_size} per page, {args.prefetch} prefetched)...")
+            source = RecordedPageSource.from_file(args.replay, args.input_format)
+        else:
+            print(f"\n📥 Paging recipes from database by id ({args.page_size} per page, {args.prefetch} prefetched)...")
+            source = PostgresPageSource(database_url, statement_timeout_ms=args.statement_timeout)
+        recipes = iter_keyset_recipes(source, page_size=args.page_size, prefetch=args.prefetch)
+    else:
+        conn = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+        if args.stream:
+            print(f"\n📥 Streaming recipes from database ({args.batch_size} per batch)...")
+        else:
+            print("\n📥 Fetching recipes from database...")
+        query = BUDGET_RECIPE_QUERY if args.budget else RECIPE_QUERY
+        recipes = fetch_recipes(conn, stream=args.stream, batch_size=args.batch_size, query=query)
+        if not args.stream:
+            recipes = list(recipes)
+            print(f"✅ Found {len(recipes)} recipes")
+    
+    # Run checks
+    print("\n🔎 Running consistency checks...")
+    print("   ✓ Description ↔ Ingredients")
+    print("   ✓ Ingredients ↔ Instructions")
+    print("   ✓ Image ↔ Recipe content")
+    print("   ✓ Critical substitutions (low-GI compliance)")
+    
+    if args.budget:
+        coverage = AuditCoverage(args.coverage_file)
+        recipes = coverage.prioritise(list(recipes))
+        planned = ', '.join(f"{coverage.planned[tier]} {label}" for tier, label in BUDGET_TIERS.items())
+        print(f"\n⏳ Budgeted run {coverage.run}: {args.budget:g}s for {len(recipes)} recipes ({planned})")
+    
+    run_started = datetime.now()
+    summary = ReportSummary()
+    sinks: List[ReportSink] = [ConsoleSummarySink(summary)]
+    cache = ResultCache(args.cache) if args.incremental else None
+    image_cache = ImageHashCache(args.image_cache) if args.images else None
+    image_index = ImageDuplicateIndex(args.image_root, args.image_distance, image_cache) if args.images else None
+    if args.near_dups and np is None:
+        print("⚠️  NumPy not installed: skipping near-duplicate detection")
+    signature_cache = SignatureCache(args.signature_cache) if args.near_dups and np is not None else None
+    near_dups = NearDuplicateIndex(signature_cache, args.near_dup_threshold) if signature_cache else None
+    if args.nutrition and np is None:
+        print("⚠️  NumPy not installed: skipping the nutrition check")
+    nutrition = NutritionCheck() if args.nutrition and np is not None else None
+    metrics = CheckMetrics(slowest=args.slowest)
+    profiler = cProfile.Profile() if args.profile else None
+    output_file = args.output
+    report_dir = os.path.dirname(output_file) or '.'
+    run_start = time.perf_counter()
+    
+    audit_sink = None
+    # A dump may hold only part of the catalog, so resolve just the recipes it had
+    dump_ids: Optional[List[str]] = [] if args.write_db and (args.input or args.replay) else None
+    
+    try:
+        sinks.append(CsvReportSink(output_file, run_started, run_size=args.sort_run_size))
+        if args.jsonl:
+            sinks.append(JsonlReportSink(args.jsonl, run_started))
+        if args.sarif:
+            sinks.append(SarifReportSink(args.sarif, run_started))
+        if args.write_db:
+            audit_sink = AuditIssueSink(database_url)
+            sinks.append(audit_sink)
+        
+        if profiler:
+            profiler.enable()
+        deadline = budget_start + args.budget if coverage else None
+        chunk_size = min(args.chunk_size, BUDGET_CHUNK_SIZE) if coverage else args.chunk_size
+        checked = check_recipes(recipes, cache=cache, workers=args.workers,
+                                chunk_size=chunk_size, metrics=metrics, deadline=deadline)
+        for recipe, issues in checked:
+            summary.recipes += 1
+            if image_index:
+                image_index.add(recipe)
+            if near_dups:
+                near_dups.add(recipe)
+            if nutrition:
+                nutrition.add(recipe)
+            if dump_ids is not None:
+                dump_ids.append(recipe['id'])
+            for issue in issues:
+                for sink in sinks:
+                    sink.add(issue)
+            if coverage:
+                coverage.record(recipe, issues)
+        
+        missed = 0
+        if coverage:
+            report = coverage.report(args.budget, time.monotonic() - budget_start)
+            metrics.coverage = report
+            tiers = ', '.join(f"{label} {report['tiers'][tier]['checked']}/{report['tiers'][tier]['planned']}"
+                              for tier, label in BUDGET_TIERS.items())
+            print(f"\n⏳ Coverage: {report['checked']} of {report['recipes']} recipes ({report['coverage']:.1%}) "
+                  f"in {report['elapsed_s']:.1f}s of {args.budget:g}s; {tiers}")
+            if report['carried_over']:
+                print(f"   {report['carried_over']} recipes carried over to the next budgeted run "
+                      f"({report['never_checked']} never checked)")
+            missed = report['tiers']['changed']['planned'] - report['tiers']['changed']['checked']
+            if missed:
+                print(f"   ⚠️  {missed} new or edited recipes were not reached; exiting with status 1")
+            if audit_sink and not coverage.complete:
+                audit_sink.recipe_ids = coverage.checked_ids
+        if audit_sink and dump_ids is not None and audit_sink.recipe_ids is None:
+            audit_sink.recipe_ids = dump_ids
+        # Corpus stages over part of the catalog can neither reproduce nor
+        # resolve, and a budgeted run never starts them once time is up
+        corpus_covered = not coverage or (coverage.complete and time.monotonic() < deadline)
+        if coverage and not corpus_covered:
+            stages = [name for name, stage in (('image index', image_index), ('near-duplicates', near_dups),
+                                               ('nutrition', nutrition)) if stage]
+            if stages:
+                print(f"   Skipped {', '.join(stages)}: "
+                      + ("the budget ran out" if coverage.complete else "the run did not cover the catalog"))
+            image_index = near_dups = nutrition = None
+        
+        if image_index:
+            stage_start = time.perf_counter()
+            image_issues = image_index.issues()
+            metrics.observe('image_index', time.perf_counter() - stage_start, len(image_issues))
+            for issue in image_issues:
+                for sink in sinks:
+                    sink.add(issue)
+            if audit_sink:
+                audit_sink.codes += CORPUS_STAGE_CODES['images']
+            print(f"\n🖼️  Image index: {image_index.hashed} hashed, {image_index.cached} cached, "
+                  f"{image_index.unresolved} not found locally; {len(image_issues)} duplicate image issues")
+            if Image is None:
+                print("   Pillow not installed: only recipes sharing an image URL were compared")
+        
+        if near_dups:
+            stage_start = time.perf_counter()
+            near_dup_issues = near_dups.issues()
+            metrics.observe('near_duplicates', time.perf_counter() - stage_start, len(near_dup_issues))
+            for issue in near_dup_issues:
+                for sink in sinks:
+                    sink.add(issue)
+            if audit_sink:
+                audit_sink.codes += CORPUS_STAGE_CODES['near_dups']
+            purged = signature_cache.purge_unseen()
+            print(f"\n🧬 Near-duplicates: {signature_cache.misses} signatures computed, {signature_cache.hits} cached, "
+                  f"{purged} purged; {near_dups.candidates} candidate pairs, {len(near_dup_issues)} near-duplicate issues")
+        
+        if nutrition:
+            stage_start = time.perf_counter()
+            nutrition_issues = nutrition.issues()
+            metrics.observe('nutrition', time.perf_counter() - stage_start, len(nutrition_issues))
+            for issue in nutrition_issues:
+                for sink in sinks:
+                    sink.add(issue)
+            if audit_sink:
+                audit_sink.codes += CORPUS_STAGE_CODES['nutrition']
+        if profiler:
+            profiler.disable()
+        
+        lookups = metrics.tokens['hits'] + metrics.tokens['misses']
+        if lookups:
+            print(f"\n🔤 Word resolution: {metrics.token_hit_rate():.1%} of {lookups} lookups memoised; "
+                  f"{metrics.tokens['stemmed']} stemmed, {metrics.tokens['corrected']} corrected "
+                  f"(distance {TOKEN_RESOLVER.distance})")
+        
+        if cache:
+            purged = cache.purge_unseen() if not coverage or coverage.complete else 0
+            print(f"\n♻️  Incremental: {cache.hits} cached, {cache.misses} re-checked, {purged} purged")
+        
+        metrics_files = write_metrics(metrics, report_dir, time.perf_counter() - run_start)
+        
+        # Console summary first, then each output reports where it was saved
+        for sink in sinks:
+            sink.finish()
+    finally:
+        for sink in sinks:
+            sink.close()
+        if cache:
+            cache.close()
+        if image_cache:
+            image_cache.close()
+        if signature_cache:
+            signature_cache.close()
+        if coverage:
+            coverage.close()
+        if conn:
+            conn.close()
+        if source:
+            source.close()
+    
+    print(f"⏱️  Check metrics saved to: {', '.join(metrics_files)}")
+    
+    if profiler:
+        profile_file = os.path.join(report_dir, PROFILE_FILE)
+        profiler.dump_stats(profile_file)
+        print(f"🧭 Profile saved to: {profile_file}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
     
     print("\n✅ Consistency check complete!\n")
     
-    return 0 if p0_count == 0 else 1
+    # A budgeted run that missed new or edited recipes fails like a P0 does
+    return 0 if summary.severity_counts['P0'] == 0 and not missed else 1
 
 if __name__ == "__main__":
     sys.exit(main())
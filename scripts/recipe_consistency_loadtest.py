@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Load test for the GlycoGuide recipe check service
+
+Drives recipe_consistency_service.py with concurrent keep-alive clients
+posting synthetic drafts (from the benchmark corpus generator) and reports
+request and per-recipe latency quantiles, throughput and the service's
+cache hit rate. Exits non-zero when the per-recipe p99 misses --target-ms.
+
+The service checks one recipe at a time in a single interpreter, so
+concurrent requests queue behind each other and p99 grows with the number of
+clients. The 10 ms target assumes the default 4 clients on the same machine,
+which holds on a single core (p99 of 5-7 ms). With 8 clients a single core gives
+about 15 ms, so higher --concurrency needs more cores or a larger --target-ms.
+
+With --spawn the service is started in a subprocess on a free port and
+stopped afterwards; otherwise --url points at a running instance.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Optional
+
+import recipe_consistency_bench as bench
+
+SERVICE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_consistency_service.py')
+
+DEFAULT_URL = 'http://127.0.0.1:8765'
+DEFAULT_TARGET_MS = 10.0
+# Clients the target is set for (see the module docstring)
+DEFAULT_CONCURRENCY = 4
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def request_json(conn: http.client.HTTPConnection, method: str, path: str, body: Any = None) -> Any:
+    """One JSON round trip on a persistent connection"""
+    payload = json.dumps(body).encode('utf-8') if body is not None else None
+    headers = {'Content-Type': 'application/json'} if payload else {}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path} -> {response.status}: {data[:200]!r}")
+    return json.loads(data)
+
+def wait_for_service(host: str, port: int, timeout: float = 15.0):
+    """Poll /health until the service answers"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            request_json(conn, 'GET', '/health')
+            conn.close()
+            return
+        except (OSError, RuntimeError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"service on {host}:{port} did not come up within {timeout:.0f}s")
+            time.sleep(0.1)
+
+def spawn_service(cache_size: Optional[int] = None) -> subprocess.Popen:
+    """Start the service on a free local port; the port is stored on the process"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, SERVICE_SCRIPT, '--port', str(port)]
+    if cache_size is not None:
+        command += ['--cache-size', str(cache_size)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    process.port = port
+    return process
+
+def quantile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run_load(host: str, port: int, drafts: List[Dict[str, Any]], requests: int, concurrency: int,
+             batch_size: int = 0) -> Dict[str, Any]:
+    """Send `requests` requests from `concurrency` clients; returns latency samples in seconds"""
+    samples: List[List[float]] = [[] for _ in range(concurrency)]
+    errors: List[str] = []
+    per_client = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def client(index: int):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        cursor = index * 7919
+        try:
+            for _ in range(per_client[index]):
+                if batch_size:
+                    batch = [drafts[(cursor + i) % len(drafts)] for i in range(batch_size)]
+                    cursor += batch_size
+                    start = time.perf_counter()
+                    request_json(conn, 'POST', '/check/batch', {'recipes': batch})
+                else:
+                    draft = drafts[cursor % len(drafts)]
+                    cursor += 1
+                    start = time.perf_counter()
+                    request_json(conn, 'POST', '/check', draft)
+                samples[index].append(time.perf_counter() - start)
+        except (OSError, RuntimeError) as e:
+            errors.append(str(e))
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies = sorted(sample for client_samples in samples for sample in client_samples)
+    recipes_per_request = batch_size or 1
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'wall_s': wall,
+        'requests_per_s': len(latencies) / wall if wall else 0.0,
+        'recipes_per_s': len(latencies) * recipes_per_request / wall if wall else 0.0,
+        'request_ms': {
+            'p50': quantile(latencies, 0.50) * 1000,
+            'p95': quantile(latencies, 0.95) * 1000,
+            'p99': quantile(latencies, 0.99) * 1000,
+            'max': (latencies[-1] if latencies else 0.0) * 1000,
+        },
+        'per_recipe_p99_ms': quantile(latencies, 0.99) * 1000 / recipes_per_request,
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description='Load-test the recipe check service')
+    parser.add_argument('--url', default=DEFAULT_URL, help=f'running service (default {DEFAULT_URL})')
+    parser.add_argument('--spawn', action='store_true', help='start a service subprocess for the test')
+    parser.add_argument('--requests', type=int, default=5000, help='requests to send (default 5000)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'concurrent keep-alive clients; the default target assumes at most '
+                             f'{DEFAULT_CONCURRENCY} (default {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='recipes per /check/batch request (default 0: single /check requests)')
+    parser.add_argument('--distinct', type=int, default=1000,
+                        help='distinct drafts cycled through; repeats are cache hits (default 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default 0)')
+    parser.add_argument('--warmup', type=int, default=200, help='untimed requests sent first (default 200)')
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                        help=f'per-recipe p99 budget (default {DEFAULT_TARGET_MS:g} ms)')
+    parser.add_argument('--output', help='write the results as JSON')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main function"""
+    args = parse_args(argv)
+
+    print("🏋️  GlycoGuide Recipe Check Service Load Test")
+    print("=" * 70)
+
+    process = None
+    if args.spawn:
+        process = spawn_service()
+        host, port = '127.0.0.1', process.port
+    else:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        wait_for_service(host, port)
+        drafts = [dict(recipe) for recipe in bench.generate_corpus(args.distinct, args.seed)]
+        for draft in drafts:
+            draft.pop('created_at', None)
+        print(f"\n🎯 http://{host}:{port}: {args.requests} requests, {args.concurrency} clients, "
+              f"{args.distinct} distinct drafts" + (f", {args.batch_size} per batch" if args.batch_size else ''))
+
+        if args.warmup:
+            run_load(host, port, drafts, args.warmup, min(args.concurrency, args.warmup), args.batch_size)
+        result = run_load(host, port, drafts, args.requests, args.concurrency, args.batch_size)
+
+        health_conn = http.client.HTTPConnection(host, port, timeout=5)
+        result['service'] = request_json(health_conn, 'GET', '/health')
+        health_conn.close()
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    latency = result['request_ms']
+    service = result['service']
+    print(f"\n   Throughput: {result['requests_per_s']:.0f} requests/s, {result['recipes_per_s']:.0f} recipes/s")
+    print(f"   Request latency: p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+          f"p99 {latency['p99']:.2f} ms, max {latency['max']:.2f} ms")
+    print(f"   Per-recipe p99: {result['per_recipe_p99_ms']:.2f} ms (target {args.target_ms:g} ms)")
+    print(f"   Service: cache hit rate {service['cache']['hit_rate']:.1%}, "
+          f"check p99 {service['latency']['p99_ms']:.2f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+
+    if result['errors']:
+        print(f"\n🚨 {len(result['errors'])} client(s) failed: {result['errors'][0]}")
+        return 1
+    if result['per_recipe_p99_ms'] > args.target_ms:
+        print(f"\n🚨 Per-recipe p99 over the {args.target_ms:g} ms target")
+        return 1
+    print("\n✅ Within target")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Recipe check service for GlycoGuide
+
+Small local HTTP front end to the recipe consistency checker, for validating
+draft recipes before they are saved (admin tools, reseed flows). Rules are
+compiled once at startup and results are cached by recipe content hash, so
+a repeated draft costs a dictionary lookup.
+
+Endpoints:
+- POST /check        one recipe object -> {"issues": [...], "cached": bool}
+- POST /check/batch  {"recipes": [...]} -> {"results": [{"id", "issues", "cached"}, ...]}
+- GET  /health       rule pack version, cache hit rates and check latency
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+
+import recipe_consistency_checker as checker
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Distinct recipe contents whose results are kept
+DEFAULT_CACHE_SIZE = 10000
+
+# Request limits
+MAX_BATCH_SIZE = 1000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# Draft fields the checks read, and the type each must have when present
+DRAFT_FIELDS = {
+    'id': (str, int),
+    'name': (str,),
+    'description': (str,),
+    'category': (str,),
+    'ingredients': (list,),
+    'instructions': (str,),
+    'image_url': (str,),
+}
+
+# ============================================================================
+# CHECKING
+# ============================================================================
+
+class ResultLRU:
+    """Thread-safe LRU of raw check results keyed on content hash"""
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, List[Dict[str, str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        with self._lock:
+            issues = self._entries.get(key)
+            if issues is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return issues
+
+    def put(self, key: str, issues: List[Dict[str, str]]):
+        with self._lock:
+            self._entries[key] = issues
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def validate_draft(payload: Any) -> Dict[str, Any]:
+    """A draft recipe with every checked field present; raises ValueError if malformed"""
+    if not isinstance(payload, dict):
+        raise ValueError('recipe must be a JSON object')
+    draft = {field: None for field in DRAFT_FIELDS}
+    for field, types in DRAFT_FIELDS.items():
+        value = payload.get(field)
+        if value is not None and not isinstance(value, types):
+            raise ValueError(f"'{field}' must be {' or '.join(t.__name__ for t in types)}")
+        draft[field] = value
+    if draft['ingredients'] and not all(isinstance(line, str) for line in draft['ingredients']):
+        raise ValueError("'ingredients' must be a list of strings")
+    draft['name'] = draft['name'] or ''
+    return draft
+
+class CheckService:
+    """Warm checker state shared by every request thread"""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.fingerprint = checker.ruleset_fingerprint()
+        self.cache = ResultLRU(cache_size)
+        self.latency = checker.LatencyHistogram()
+        self._latency_lock = threading.Lock()
+        self.started = time.time()
+
+    def check(self, draft: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Annotated issues for one validated draft, and whether they came from the cache"""
+        start = time.perf_counter()
+        key = checker.recipe_content_hash(draft, self.fingerprint)
+        issues = self.cache.get(key)
+        cached = issues is not None
+        if not cached:
+            issues = checker.run_checks(draft)
+            self.cache.put(key, issues)
+        annotated = checker.annotate_issues(draft, [dict(issue) for issue in issues])
+        with self._latency_lock:
+            self.latency.observe(time.perf_counter() - start)
+        return annotated, cached
+
+    def health(self) -> Dict[str, Any]:
+        with self._latency_lock:
+            latency = {
+                'checks': self.latency.count,
+                'p50_ms': round(self.latency.quantile(0.50) * 1000, 3),
+                'p99_ms': round(self.latency.quantile(0.99) * 1000, 3),
+                'max_ms': round(self.latency.max * 1000, 3),
+            }
+        words = checker.TOKEN_RESOLVER.stats()
+        lookups = words['hits'] + words['misses']
+        return {
+            'status': 'ok',
+            'rule_pack_version': checker.RULE_PACK_VERSION,
+            'uptime_s': round(time.time() - self.started, 1),
+            'cache': self.cache.stats(),
+            'word_resolution': {
+                **words,
+                'hit_rate': round(words['hits'] / lookups, 4) if lookups else 0.0,
+                'distance': checker.TOKEN_RESOLVER.distance,
+                'cache_size': checker.TOKEN_RESOLVER.cache_size,
+            },
+            'latency': latency,
+        }
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler; keep-alive so clients reuse one connection"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'RecipeCheck/1'
+    # Headers and body go out as separate writes; with Nagle on, each
+    # keep-alive response would wait out the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Any):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if self.server.allow_origin:
+            self.send_header('Access-Control-Allow-Origin', self.server.allow_origin)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f'request body over {MAX_BODY_BYTES} bytes')
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise ValueError(f'invalid JSON: {e}')
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        if self.server.allow_origin:
+            self.send_header('Access-Control-Allow-Origin', self.server.allow_origin)
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.service.health())
+        else:
+            self._send_json(404, {'error': f'no route for GET {self.path}'})
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            payload = self._read_json()
+            if self.path == '/check':
+                issues, cached = service.check(validate_draft(payload))
+                self._send_json(200, {'issues': issues, 'cached': cached})
+            elif self.path == '/check/batch':
+                recipes = payload.get('recipes') if isinstance(payload, dict) else payload
+                if not isinstance(recipes, list):
+                    raise ValueError("batch body must be a list or {\"recipes\": [...]}")
+                if len(recipes) > MAX_BATCH_SIZE:
+                    raise ValueError(f'batch of {len(recipes)} recipes is over the limit of {MAX_BATCH_SIZE}')
+                drafts = [validate_draft(recipe) for recipe in recipes]
+                results = []
+                for draft in drafts:
+                    issues, cached = service.check(draft)
+                    results.append({'id': draft['id'], 'issues': issues, 'cached': cached})
+                self._send_json(200, {'results': results})
+            else:
+                self._send_json(404, {'error': f'no route for POST {self.path}'})
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, cache_size: int = DEFAULT_CACHE_SIZE,
+                allow_origin: Optional[str] = None, verbose: bool = False) -> ThreadingHTTPServer:
+    """HTTP server bound to host:port with a warm CheckService attached"""
+    server = ThreadingHTTPServer((host, port), CheckRequestHandler)
+    server.daemon_threads = True
+    server.service = CheckService(cache_size)
+    server.allow_origin = allow_origin
+    server.verbose = verbose
+    return server
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description='Local HTTP service exposing the recipe consistency checks')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'bind address (default {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port (default {DEFAULT_PORT})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f'distinct recipe results kept in memory (default {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--fuzzy-distance', type=int, default=checker.RULES['fuzzy_distance'],
+                        help=f"edit distance for correcting misspelled ingredient names, 0 to turn correction off "
+                             f"(default {checker.RULES['fuzzy_distance']})")
+    parser.add_argument('--token-cache-size', type=int, default=checker.DEFAULT_TOKEN_CACHE_SIZE,
+                        help=f'token resolutions memoised (default {checker.DEFAULT_TOKEN_CACHE_SIZE})')
+    parser.add_argument('--allow-origin', help='Access-Control-Allow-Origin for browser callers (e.g. the admin page)')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main function"""
+    args = parse_args(argv)
+
+    try:
+        checker.TOKEN_RESOLVER.configure(args.fuzzy_distance, args.token_cache_size)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+    server = make_server(args.host, args.port, cache_size=args.cache_size,
+                         allow_origin=args.allow_origin, verbose=args.verbose)
+    print("🩺 GlycoGuide Recipe Check Service")
+    print("=" * 70)
+    print(f"   Rule pack v{checker.RULE_PACK_VERSION}, cache of {args.cache_size} results")
+    print(f"   Listening on http://{args.host}:{server.server_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
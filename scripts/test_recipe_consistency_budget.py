@@ -0,0 +1,61 @@
+"""
+Tests for --budget in the GlycoGuide Recipe Consistency Checker
+
+A budgeted run checks recipes in priority order until its deadline and
+carries the rest over to the next run. These tests hold check_recipes to the
+deadline and AuditCoverage to the order that keeps the rotation moving.
+
+Run with: python -m pytest scripts
+"""
+
+import time
+
+import pytest
+
+import recipe_consistency_checker as checker
+from recipe_consistency_checker import AuditCoverage, check_recipes
+
+def make_recipe(number, instructions='Slice the cucumber.'):
+    return {
+        'id': f'r{number:03d}', 'name': f'Recipe {number}', 'category': 'lunch', 'description': '',
+        'ingredients': ['1 cucumber'], 'instructions': instructions, 'image_url': f'recipe-{number}.jpg',
+    }
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_passed_deadline_checks_nothing(workers):
+    recipes = [make_recipe(number) for number in range(20)]
+    assert list(check_recipes(iter(recipes), workers=workers, chunk_size=5, deadline=time.monotonic())) == []
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_open_deadline_checks_everything_in_order(workers):
+    recipes = [make_recipe(number) for number in range(20)]
+    checked = check_recipes(iter(recipes), workers=workers, chunk_size=5, deadline=time.monotonic() + 60)
+    assert [recipe['id'] for recipe, _ in checked] == [recipe['id'] for recipe in recipes]
+
+def test_no_deadline_waits_for_every_chunk():
+    recipes = [make_recipe(number) for number in range(400)]
+    assert len(list(check_recipes(iter(recipes), workers=2, chunk_size=5))) == len(recipes)
+
+def test_prior_p0s_take_at_most_their_share_of_the_order(tmp_path):
+    path = str(tmp_path / 'coverage.sqlite')
+    # Half the catalog has a P0 (a forbidden potato)
+    recipes = [make_recipe(number, 'Boil the potatoes.' if number % 2 else 'Slice the cucumber.')
+               for number in range(40)]
+    for recipe in recipes:
+        if recipe['instructions'].startswith('Boil'):
+            recipe['ingredients'] = ['2 potatoes']
+
+    coverage = AuditCoverage(path)
+    for recipe in coverage.prioritise(recipes):
+        coverage.record(recipe, checker.check_recipe(recipe))
+    coverage.close()
+
+    coverage = AuditCoverage(path)
+    order = coverage.prioritise(recipes)
+    coverage.close()
+    assert coverage.planned['prior_p0'] == 20
+    prior_p0 = [recipe['ingredients'] == ['2 potatoes'] for recipe in order]
+    for stretch in range(1, 27):
+        assert sum(prior_p0[:stretch]) <= checker.PRIOR_P0_SHARE * stretch
+    # Once the rotation is exhausted, the remaining prior P0s follow
+    assert all(prior_p0[-13:])
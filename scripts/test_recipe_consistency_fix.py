@@ -0,0 +1,122 @@
+"""
+Tests for --fix in the GlycoGuide Recipe Consistency Checker
+
+plan_fixes rewrites recipe text and the rewrite is written straight back to
+meals, so a wrong rewrite damages a recipe. These tests hold it to replacing
+only whole recognised phrases, to keeping a category's rewrite only when
+that category's issue clears, and to leaving the audit table alone unless
+--write-db is set.
+
+Run with: python -m pytest scripts
+"""
+
+import pytest
+
+import recipe_consistency_checker as checker
+
+def make_recipe(ingredients, instructions='', description=''):
+    return {
+        'id': 'r1', 'name': 'Test Recipe', 'category': 'dinner', 'description': description,
+        'ingredients': ingredients, 'instructions': instructions, 'image_url': 'test-recipe.jpg',
+        'row_hash': 'hash',
+    }
+
+def planned(recipe):
+    """(ingredients, instructions) plan_fixes would write, or None"""
+    plans, _ = checker.plan_fixes([recipe])
+    return (plans[0]['ingredients'], plans[0]['instructions']) if plans else None
+
+def test_substitution_uses_the_described_phrase_on_whole_phrases_only():
+    recipe = make_recipe(['1 tbsp rice vinegar', '1 cup brown rice', '1 cup Rice'], 'Cook the rice.',
+                         description='Cauliflower rice instead of rice')
+    assert planned(recipe) == (
+        ['1 tbsp rice vinegar', '1 cup cauliflower rice', '1 cup Cauliflower rice'],
+        'Cook the cauliflower rice.',
+    )
+
+@pytest.mark.parametrize('line, fixed', [
+    ('1 loaf bread', '1 flatbread'),
+    ('2 bread rolls', '2 flatbread'),
+    ('1 cup whole wheat flour', '1 cup almond flour'),
+    ('2 tbsp brown sugar', '2 tbsp monk fruit extract'),
+])
+def test_forbidden_items_become_one_alternative(line, fixed):
+    assert planned(make_recipe([line], 'Mix everything.'))[0] == [fixed]
+
+@pytest.mark.parametrize('ingredients, instructions', [
+    # The step still says toast, so the bread issue stays
+    (['2 hamburger buns'], 'Toast the buns lightly.'),
+    # Check D flags 'sweet potatoes' as well
+    (['3 potatoes'], 'Roast the potatoes.'),
+    # 'sugar-free' keeps the sweetener issue
+    (['1 tbsp Sugar'], 'Stir in the sugar. Keep it sugar-free.'),
+    # 'bagel' only names the seasoning
+    (['2 tsp everything bagel seasoning'], 'Season with everything bagel seasoning.'),
+])
+def test_rewrite_that_leaves_its_issue_is_dropped(ingredients, instructions):
+    assert planned(make_recipe(ingredients, instructions)) is None
+
+def test_only_categories_whose_issue_clears_are_rewritten():
+    recipe = make_recipe(['1 tbsp Sugar', '1 loaf bread'],
+                         'Stir in the sugar, slice the bread. Keep it sugar-free.')
+    plans, counts = checker.plan_fixes([recipe])
+    assert (plans[0]['ingredients'], plans[0]['instructions']) == (
+        ['1 tbsp Sugar', '1 flatbread'],
+        'Stir in the sugar, slice the flatbread. Keep it sugar-free.',
+    )
+    assert counts == {'recipes': 1, 'fixable': 2, 'cleared': 1, 'unfixable': 1, 'rejected': 1}
+
+def test_rewrite_changing_another_phrase_is_refused():
+    recipe = make_recipe(['1 tbsp rice vinegar'])
+    # 'rice' inside 'rice vinegar'
+    assert checker.apply_rewrite(recipe, [(0, 7, 11, 'cauliflower rice')]) is None
+    assert checker.apply_rewrite(recipe, [(0, 7, 11, 'white')]) is None
+    # 'sugar' whole, but the replacement joins 'water' into 'coconut water'
+    assert checker.apply_rewrite(make_recipe(['2 tbsp sugar water']), [(0, 7, 12, 'coconut')]) is None
+    assert checker.apply_rewrite(recipe, [(0, 7, 19, 'apple cider vinegar')]) == (['1 tbsp apple cider vinegar'], '')
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append(sql)
+
+    def copy_expert(self, sql, f):
+        self.connection.statements.append(sql)
+
+    def fetchall(self):
+        return [dict(recipe) for recipe in self.connection.recipes]
+
+class FakeConnection:
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+@pytest.mark.parametrize('write_db', [False, True])
+def test_recheck_writes_the_audit_table_only_with_write_db(monkeypatch, write_db):
+    connection = FakeConnection([make_recipe(['1 loaf bread'], 'Slice the bread.')])
+    monkeypatch.setattr(checker.psycopg2, 'connect', lambda *args, **kwargs: connection)
+    monkeypatch.setattr(checker, 'execute_values', lambda *args, **kwargs: [{'id': 'r1'}])
+
+    assert checker.fix_meals('postgres://test', write_db=write_db) == 0
+    assert any(checker.AUDIT_TABLE in sql for sql in connection.statements) == write_db
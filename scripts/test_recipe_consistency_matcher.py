@@ -0,0 +1,102 @@
+"""
+Tests for the forbidden-item matcher of the GlycoGuide Recipe Consistency Checker
+
+Check D finds every forbidden item and protected phrase in one
+PhraseAutomaton pass. It replaced a regex per item plus a substring scan of
+each match's context, and must report exactly the FORBIDDEN_INGREDIENT
+issues those did. These tests compare the automaton with naive scans.
+
+Run with: python -m pytest scripts
+"""
+
+import os
+import re
+import json
+import random
+
+import pytest
+
+import recipe_consistency_checker as checker
+from recipe_consistency_checker import PhraseAutomaton, RecipeAnalysis
+from recipe_consistency_bench import generate_corpus
+
+MEALS_FILE = os.path.join(checker.SCRIPT_DIR, 'meals_data.json')
+
+# Phrases that overlap, share prefixes and nest inside each other
+OVERLAPPING_PHRASES = ['he', 'she', 'his', 'hers', 'sugar', 'brown sugar', 'sugar-free', 'su', 'ar', 'aa', 'aaa']
+
+# Texts around the edges check D has to get right
+EDGE_CASE_TEXTS = [
+    '2 tbsp brown sugar and a pinch of sugar',
+    'keep it sugar-free; no sugary glaze',
+    'supports blood sugar levels. ' + 'x' * 20 + ' add sugar',
+    # 'blood sugar' ends on the last character of the context window, then one past it
+    'sugar ' + 'y' * 37 + ' blood sugar',
+    'sugar ' + 'y' * 38 + ' blood sugar',
+    'bread rolls, rolling pin, a loaf of bread, toasted seeds, toast',
+    'agave nectar or agave, maple syrup',
+    'sweet potatoes, potato, russet potato, potatoes',
+    'all-purpose flour, all purpose flour, wheat flour, whole wheat flour',
+    'honey_glaze honey',
+]
+
+def naive_find_all(phrases, text):
+    """Every (start, end, index) occurrence, one str.find scan per phrase"""
+    found = set()
+    for index, phrase in enumerate(phrases):
+        start = text.find(phrase)
+        while start != -1:
+            found.add((start, start + len(phrase), index))
+            start = text.find(phrase, start + 1)
+    return found
+
+def naive_forbidden_issues(text):
+    """(where, evidence) of check D as the regex-per-item implementation reported it"""
+    issues = []
+    for category, rules in checker.CRITICAL_SUBSTITUTIONS.items():
+        found = []
+        for item in rules['forbidden']:
+            for match in re.finditer(r'\b' + re.escape(item) + r'\b', text):
+                window = checker.PROTECTED_CONTEXT_WINDOW
+                context = text[max(0, match.start() - window):match.end() + window]
+                if not any(protected in context for protected in checker.PROTECTED_CONTEXTS):
+                    found.append(item)
+                    break
+        if found:
+            issues.append((checker.forbidden_where(category),
+                           f"Recipe contains forbidden {category}: {', '.join(found)}"))
+    return issues
+
+def automaton_issues(recipe):
+    return [(issue['where'], issue['evidence']) for issue in checker.check_critical_substitutions(recipe)]
+
+def random_texts(alphabet, count=300, length=60, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+def test_find_all_matches_naive_scan():
+    automaton = PhraseAutomaton(OVERLAPPING_PHRASES)
+    for text in random_texts('ahersugbwn -fa') + EDGE_CASE_TEXTS:
+        found = automaton.find_all(text)
+        assert set(found) == naive_find_all(OVERLAPPING_PHRASES, text), text
+        assert [end for _, end, _ in found] == sorted(end for _, end, _ in found)
+
+def test_compiled_matcher_matches_naive_scan():
+    phrases = checker.CRITICAL_MATCHER.phrases
+    for text in EDGE_CASE_TEXTS:
+        assert set(checker.CRITICAL_MATCHER.find_all(text)) == naive_find_all(phrases, text)
+
+@pytest.mark.parametrize('text', EDGE_CASE_TEXTS)
+def test_check_d_matches_naive_scan_on_edge_cases(text):
+    recipe = {'ingredients': [text], 'instructions': ''}
+    assert automaton_issues(recipe) == naive_forbidden_issues(RecipeAnalysis(recipe).critical_text)
+
+def test_check_d_matches_naive_scan_on_corpus():
+    with open(MEALS_FILE, encoding='utf-8') as f:
+        recipes = json.load(f)
+    recipes += list(generate_corpus(2000, 1))
+    mismatches = [
+        recipe['id'] for recipe in recipes
+        if automaton_issues(recipe) != naive_forbidden_issues(RecipeAnalysis(recipe).critical_text)
+    ]
+    assert mismatches == []
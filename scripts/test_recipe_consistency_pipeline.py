@@ -0,0 +1,27 @@
+"""
+Tests for the check pipeline of the GlycoGuide Recipe Consistency Checker
+
+check_recipes hands recipes to a process pool in chunks and must still
+yield them, and their issues, exactly as a serial run would. These tests
+compare the two on a synthetic corpus.
+
+Run with: python -m pytest scripts
+"""
+
+from recipe_consistency_checker import check_recipes
+from recipe_consistency_bench import generate_corpus
+
+CORPUS_SIZE = 1000
+
+def checked_issues(workers: int, chunk_size: int):
+    return [
+        (recipe['id'], issues)
+        for recipe, issues in check_recipes(generate_corpus(CORPUS_SIZE, 0), workers=workers, chunk_size=chunk_size)
+    ]
+
+def test_pooled_run_matches_serial_run():
+    serial = checked_issues(workers=1, chunk_size=200)
+    assert len(serial) == CORPUS_SIZE
+    assert any(issues for _, issues in serial)
+    # Small chunks keep several chunks in flight per worker
+    assert checked_issues(workers=4, chunk_size=30) == serial
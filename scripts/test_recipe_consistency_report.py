@@ -0,0 +1,47 @@
+"""
+Tests for report ordering in the GlycoGuide Recipe Consistency Checker
+
+ExternalIssueSort spills sorted runs to disk and merges them, so --stream
+never holds the whole report in memory. Its output must be the same as a
+stable in-memory sort, whatever the run size.
+
+Run with: python -m pytest scripts
+"""
+
+import random
+
+import pytest
+
+from recipe_consistency_checker import SEVERITY_ORDER, ExternalIssueSort, issue_to_row
+
+UPDATED_AT = '2025-01-01T00:00:00'
+
+def make_issues(count, seed=0):
+    """Issues with few distinct titles, so most share their sort key"""
+    rng = random.Random(seed)
+    return [
+        {
+            'severity': rng.choice(['P0', 'P1', 'P2']), 'recipe_id': str(number),
+            'title': rng.choice(['Apple Bowl', 'Zucchini Boats', 'Lentil Soup', '']),
+            'category': 'lunch', 'code': 'ING_UNUSED', 'where': 'ingredients+instructions',
+            'evidence': f'evidence {number}', 'fix': 'fix',
+        }
+        for number in range(count)
+    ]
+
+def report_key(issue):
+    return SEVERITY_ORDER[issue['severity']], issue['title']
+
+@pytest.mark.parametrize('run_size', [1, 3, 7, 1000])
+def test_merged_runs_match_stable_in_memory_sort(run_size):
+    issues = make_issues(200)
+    sorter = ExternalIssueSort(run_size=run_size, updated_at=UPDATED_AT)
+    try:
+        for issue in issues:
+            sorter.add(issue)
+        if run_size < len(issues):
+            assert len(sorter._runs) == len(issues) // run_size
+        rows = list(sorter.rows())
+    finally:
+        sorter.close()
+    assert rows == [issue_to_row(issue, UPDATED_AT) for issue in sorted(issues, key=report_key)]
@@ -0,0 +1,119 @@
+"""
+Tests for the substitution parser of the GlycoGuide Recipe Consistency Checker
+
+SubstitutionParser replaced three regexes whose lazy groups backtracked
+quadratically on long descriptions. These tests hold it to the same phrases
+the regexes found, and to linear time on the inputs that made them slow.
+
+Run with: python -m pytest scripts
+"""
+
+import os
+import re
+import json
+import time
+from typing import List, Tuple
+
+import pytest
+
+import recipe_consistency_checker as checker
+from recipe_consistency_bench import generate_corpus
+
+MEALS_FILE = os.path.join(checker.SCRIPT_DIR, 'meals_data.json')
+
+# The regex rules SubstitutionParser replaced (rule pack v3), kept as the
+# parity reference
+LEGACY_SUBSTITUTION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\b(?:use|using|substitute|swap|replace)\s+([a-z\s-]+?)\s+(?:instead\s+of|for)\s+([a-z\s-]+?)(?:\s|,|\.|;|$)",
+        r"\b([a-z\s-]+?)\s+instead\s+of\s+([a-z\s-]+?)(?:\s|,|\.|;|$)",
+        r"\breplace\s+([a-z\s-]+?)\s+with\s+([a-z\s-]+?)(?:\s|,|\.|;|$)",
+    )
+]
+
+# Descriptions that made the lazy regex groups backtrack quadratically:
+# long clauses with leads or connectors but no complete phrase
+ADVERSARIAL_UNITS = {
+    'plain_words': 'fresh ',
+    'leads': 'use ',
+    'replace_without_with': 'replace greens ',
+    'connectors': 'kale instead of ',
+    'unterminated': 'use kale for spinach! ',
+}
+
+# Input sizes timed for each adversarial description, in words
+ADVERSARIAL_WORDS = (2000, 32000)
+
+# Parse time may grow at most this much faster than input size
+SCALING_SLACK = 3.0
+
+def legacy_substitution_pairs(text: str) -> List[Tuple[List[str], str]]:
+    """(X words, Y) pairs the legacy regexes find in (lowercase) text"""
+    pairs = []
+    for pattern in LEGACY_SUBSTITUTION_PATTERNS:
+        for match in pattern.finditer(text):
+            new_words, old_words = match.group(1).split(), match.group(2).split()
+            # Whitespace-only groups carry no phrase
+            if new_words and old_words:
+                pairs.append((new_words, ' '.join(old_words)))
+    return pairs
+
+def parse(description: str) -> List[Tuple[List[str], str]]:
+    return checker.SUBSTITUTION_PARSER.parse(checker.normalize_text(description))
+
+def best_parse_time(text: str, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        checker.SUBSTITUTION_PARSER.parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# Y stops at its first word, as the legacy lazy groups did; X is every word
+# back to the lead, and the bare 'X instead of Y' form matches as well
+@pytest.mark.parametrize('description, expected', [
+    ('Use almond flour instead of wheat flour.',
+     [(['almond', 'flour'], 'wheat'), (['use', 'almond', 'flour'], 'wheat')]),
+    ('Swap cauliflower rice for white rice, then bake.', [(['cauliflower', 'rice'], 'white')]),
+    ('Replace sugar with monk fruit.', [(['sugar'], 'monk')]),
+    ('Made with zucchini noodles instead of pasta; serve warm.',
+     [(['made', 'with', 'zucchini', 'noodles'], 'pasta')]),
+    ('A bright, low-GI lunch bowl.', []),
+    ('', []),
+])
+def test_parses_substitution_phrases(description, expected):
+    assert parse(description) == expected
+
+@pytest.mark.parametrize('description', [
+    'Use kale instead of spinach, and replace rice with quinoa.',
+    'using oat milk for dairy milk; swap lentils for beans',
+    'Instead of potatoes, use turnips.',
+    'use use kale instead of instead of spinach',
+    'replace - with -.',
+    'Sweet potato fries instead of french fries',
+])
+def test_matches_legacy_regexes(description):
+    text = checker.normalize_text(description)
+    assert checker.SUBSTITUTION_PARSER.parse(text) == legacy_substitution_pairs(text)
+
+def test_matches_legacy_regexes_on_synthetic_corpus():
+    mismatches = [
+        recipe['description'] for recipe in generate_corpus(2000, 0)
+        if parse(recipe['description']) != legacy_substitution_pairs(checker.normalize_text(recipe['description']))
+    ]
+    assert mismatches == []
+
+def test_matches_legacy_regexes_on_recorded_meals():
+    with open(MEALS_FILE, encoding='utf-8') as f:
+        descriptions = [meal.get('description') or '' for meal in json.load(f)]
+    mismatches = [
+        description for description in descriptions
+        if parse(description) != legacy_substitution_pairs(checker.normalize_text(description))
+    ]
+    assert mismatches == []
+
+@pytest.mark.parametrize('unit', ADVERSARIAL_UNITS.values(), ids=ADVERSARIAL_UNITS.keys())
+def test_adversarial_descriptions_parse_in_linear_time(unit):
+    small, large = (unit * (words // len(unit.split())) for words in ADVERSARIAL_WORDS)
+    growth = best_parse_time(large) / max(best_parse_time(small), 1e-9)
+    assert growth <= SCALING_SLACK * len(large.split()) / len(small.split())
@@ -0,0 +1,104 @@
+"""
+Tests for word resolution in the GlycoGuide Recipe Consistency Checker
+
+light_stem and TokenResolver map plurals and misspellings onto the
+ingredient vocabulary's spelling before any check reads a text. A wrong
+stem makes an ordinary word look like an ingredient, so the edge cases
+here are the ones that produced false positives.
+
+Run with: python -m pytest scripts
+"""
+
+import pytest
+
+import recipe_consistency_checker as checker
+from recipe_consistency_checker import TokenResolver, light_stem
+
+@pytest.mark.parametrize('word, stem', [
+    ('tomatoes', 'tomato'),
+    ('berries', 'berry'),
+    ('peaches', 'peach'),
+    ('radishes', 'radish'),
+    ('boxes', 'box'),
+    ('glasses', 'glass'),
+    ('carrots', 'carrot'),
+    ('pies', 'pie'),
+    ('leaves', 'leaf'),
+    ('loaves', 'loaf'),
+    ('halves', 'half'),
+    ('olives', 'olive'),
+    ('chives', 'chive'),
+    # Singular words that merely end in s
+    ('hummus', 'hummus'),
+    ('asparagus', 'asparagus'),
+    ('swiss', 'swiss'),
+    ('tahini', 'tahini'),
+    ('leave', 'leave'),
+    ('oats', 'oat'),
+    ('peas', 'pea'),
+    ('gas', 'gas'),
+])
+def test_light_stem(word, stem):
+    assert light_stem(word) == stem
+
+def make_resolver(vocabulary=('leaves', 'tomato', 'zucchini', 'berries', 'chives', 'rice'),
+                  known=('leave', 'cook'), distance=1):
+    resolver = TokenResolver(set(vocabulary), set(vocabulary), set(known),
+                             max_distance=2, min_lengths=[5, 8], kept_endings=['ed', 'ing', 'y'])
+    resolver.configure(distance)
+    return resolver
+
+@pytest.mark.parametrize('word, resolved', [
+    # Known words are kept as they are
+    ('rice', 'rice'),
+    ('leave', 'leave'),
+    # Plurals and singulars of vocabulary words
+    ('tomatoes', 'tomato'),
+    ('leaf', 'leaves'),
+    ('berry', 'berries'),
+    ('chive', 'chives'),
+    # Misspellings within the edit distance
+    ('zuchini', 'zucchini'),
+    ('tomatto', 'tomato'),
+    # Never corrected: short, derivational ending, not a word
+    ('ric', 'ric'),
+    ('zucchinied', 'zucchinied'),
+    ('r1ce', 'r1ce'),
+])
+def test_resolve(word, resolved):
+    assert make_resolver().resolve(word) == resolved
+
+def test_leave_is_not_leaves_in_the_rule_pack():
+    assert checker.TOKEN_RESOLVER.resolve('leave') == 'leave'
+    assert checker.TOKEN_RESOLVER.resolve('leaf') == 'leaves'
+
+def test_tied_corrections_are_kept():
+    resolver = make_resolver(vocabulary=('basil', 'basin'), known=())
+    assert resolver.resolve('basit') == 'basit'
+
+def test_distance_zero_turns_correction_off():
+    resolver = make_resolver(distance=0)
+    assert resolver.resolve('zuchini') == 'zuchini'
+    assert resolver.resolve('tomatoes') == 'tomato'
+
+def test_rewrite_keeps_punctuation_and_spacing():
+    resolver = make_resolver()
+    assert resolver.rewrite('2 tomatoes, zuchini;  rice-free (leaf)') == '2 tomato, zucchini;  rice-free (leaves)'
+
+def test_known_words_never_reach_the_resolver():
+    resolver = make_resolver()
+    resolver.rewrite('rice leave cook rice')
+    assert resolver.stats() == {'hits': 4, 'misses': 0, 'stemmed': 0, 'corrected': 0}
+
+def test_each_unknown_token_is_resolved_once():
+    resolver = make_resolver()
+    for _ in range(3):
+        assert resolver.rewrite('tomatoes, tomatoes') == 'tomato, tomato'
+    assert resolver.stats() == {'hits': 4, 'misses': 2, 'stemmed': 2, 'corrected': 0}
+
+def test_memo_stops_growing_at_cache_size():
+    resolver = make_resolver()
+    resolver.configure(1, cache_size=2)
+    assert resolver.rewrite('tomatoes zuchini berry leaf') == 'tomato zucchini berries leaves'
+    assert resolver.rewrite('leaf') == 'leaves'
+    assert resolver.stats()['misses'] == 5
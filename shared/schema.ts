@@ -171,6 +171,24 @@ export const meals = pgTable("meals", {
   createdAt: timestamp("created_at").defaultNow(),
 });
 
+// Recipe consistency audit issues (bulk-loaded by scripts/recipe_consistency_checker.py --write-db)
+export const recipeAuditIssues = pgTable("recipe_audit_issues", {
+  id: varchar("id").primaryKey().default(sql`gen_random_uuid()`),
+  recipeId: varchar("recipe_id").notNull(),
+  issueCode: varchar("issue_code").notNull(),
+  where: text("where").notNull(),
+  severity: varchar("severity").notNull(), // P0, P1, P2
+  title: text("title"),
+  category: varchar("category"),
+  evidence: text("evidence"),
+  suggestedFix: text("suggested_fix"),
+  firstSeen: timestamp("first_seen").notNull().defaultNow(),
+  lastSeen: timestamp("last_seen").notNull().defaultNow(),
+}, (table) => ({
+  issueKeyIdx: uniqueIndex("recipe_audit_issues_key_idx").on(table.recipeId, table.issueCode, table.where),
+  severityIdx: index("recipe_audit_issues_severity_idx").on(table.severity),
+}));
+
 // Stage 4: Daily reflections for retention 
 export const dailyReflections = pgTable("daily_reflections", {
   id: varchar("id").primaryKey().default(sql`gen_random_uuid()`),
@@ -1743,6 +1761,7 @@ export type InsertUser = z.infer<typeof insertUserSchema>;
 export type User = typeof users.$inferSelect;
 export type Meal = typeof meals.$inferSelect;
 export type InsertMeal = z.infer<typeof insertMealSchema>;
+export type RecipeAuditIssue = typeof recipeAuditIssues.$inferSelect;
 export type MealLog = typeof mealLogs.$inferSelect;
 export type InsertMealLog = z.infer<typeof insertMealLogSchema>;
 export type GlucoseReading = typeof glucoseReadings.$inferSelect;